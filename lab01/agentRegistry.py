@@ -0,0 +1,180 @@
+# agentRegistry.py
+# ----------------
+# Finds agent classes by name for pacman.py, gridworld.py and the autograder.
+
+
+"""
+Agent classes register themselves when their module is imported:
+
+    @registerAgent
+    class GreedyAgent(Agent):
+        ...
+
+getAgent(name) returns the registered agent of that name.  For an agent not
+registered yet, it consults an index of the *Agents.py files on the search
+path ($PYTHONPATH and the current directory), which maps each name defined at
+the top level of those files to the files defining it, and imports only those
+modules.
+
+The index is kept in .agentIndex.json next to this file.  A lookup checks only
+the files the index names for the agent; the whole search path is rescanned,
+one file at a time and only where a file's mtime or size changed, when those
+files are stale or the name is unknown.
+"""
+
+import json
+import os
+import re
+
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.agentIndex.json')
+
+TOP_LEVEL_NAME = re.compile(r'^(?:class|def)\s+(\w+)|^(\w+)\s*=', re.M)
+
+_agents = {}
+
+def registerAgent(agent):
+    "Class decorator making agent available to getAgent under its class name"
+    _agents[agent.__name__] = agent
+    return agent
+
+def agentSearchPath():
+    "The directories searched for *Agents.py files, as in pacman.loadAgent"
+    pythonPathStr = os.path.expandvars("$PYTHONPATH")
+    if pythonPathStr.find(';') == -1:
+        pythonPathDirs = pythonPathStr.split(':')
+    else:
+        pythonPathDirs = pythonPathStr.split(';')
+    pythonPathDirs.append('.')
+    return [d for d in pythonPathDirs if os.path.isdir(d)]
+
+def agentFiles(directories):
+    paths = []
+    for moduleDir in directories:
+        moduleNames = sorted([f for f in os.listdir(moduleDir) if f.endswith('gents.py')])
+        paths.extend([os.path.abspath(os.path.join(moduleDir, f)) for f in moduleNames])
+    return paths
+
+def definedNames(path):
+    "The names defined at the top level of the source file at path"
+    with open(path) as f:
+        source = f.read()
+    return sorted(set([a or b for a, b in TOP_LEVEL_NAME.findall(source)]))
+
+def fileStamp(path):
+    info = os.stat(path)
+    return [info.st_mtime, info.st_size]
+
+class AgentIndex:
+    """
+    Maps each file to its stamp (mtime and size) and the names it defines,
+    and each name to the files defining it.
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.files = {} # path -> [mtime, size, names]
+        self.names = {} # name -> [paths]
+        self.dirty = False
+        try:
+            with open(path) as f:
+                self.files = json.load(f)
+        except (IOError, ValueError):
+            pass # a missing or unreadable index is rebuilt
+        self.indexNames()
+
+    def indexNames(self):
+        self.names = {}
+        for path in sorted(self.files):
+            for name in self.files[path][2]:
+                self.names.setdefault(name, []).append(path)
+
+    def isCurrent(self, path):
+        try:
+            return fileStamp(path) == self.files[path][:2]
+        except OSError:
+            return False
+
+    def refresh(self, paths):
+        "Rescans the files in paths that changed and forgets the others"
+        files = {}
+        for path in paths:
+            if path in self.files and self.isCurrent(path):
+                files[path] = self.files[path]
+            else:
+                try:
+                    files[path] = fileStamp(path) + [definedNames(path)]
+                except (IOError, OSError):
+                    continue
+        if files != self.files:
+            self.files = files
+            self.dirty = True
+            self.indexNames()
+
+    def lookup(self, name, directories):
+        """
+        The *Agents.py files in directories that define name, in the order of
+        directories, as pacman.loadAgent tried them, and by file name within
+        a directory.
+        """
+        paths = self.definingFiles(name, directories)
+        if paths and all([self.isCurrent(p) for p in paths]):
+            return paths
+        self.refresh(agentFiles(directories))
+        self.save()
+        return self.definingFiles(name, directories)
+
+    def definingFiles(self, name, directories):
+        order = {}
+        for position, directory in enumerate(directories):
+            order.setdefault(os.path.abspath(directory), position)
+        paths = [p for p in self.names.get(name, []) if os.path.dirname(p) in order]
+        # The sort is stable, and names keeps the files of a directory sorted
+        paths.sort(key=lambda p: order[os.path.dirname(p)])
+        return paths
+
+    def save(self):
+        if not self.dirty: return
+        temporary = '%s.%d' % (self.path, os.getpid())
+        try:
+            with open(temporary, 'w') as f:
+                json.dump(self.files, f, indent=0, sort_keys=True)
+            os.rename(temporary, self.path)
+            self.dirty = False
+        except (IOError, OSError):
+            pass # the index is an optimization only
+
+_index = None
+
+def getIndex():
+    "Returns the shared AgentIndex, reading it on first use."
+    global _index
+    if _index == None:
+        _index = AgentIndex()
+    return _index
+
+def getAgent(name, directories=None):
+    """
+    Returns the agent class called name, importing only the modules whose
+    source defines it.  If none of them has it, every *Agents.py module is
+    imported and searched, as pacman.loadAgent used to do.
+    """
+    if name in _agents: return _agents[name]
+    if directories == None: directories = agentSearchPath()
+    agent = findAgent(name, getIndex().lookup(name, directories))
+    if agent == None:
+        # Only now list the directories, as the index lookup usually succeeds
+        agent = findAgent(name, agentFiles(directories))
+    if agent == None:
+        raise Exception('The agent ' + name + ' is not specified in any *Agents.py.')
+    return agent
+
+def findAgent(name, paths):
+    "Imports the modules at paths in turn until one has name; None if none has"
+    for path in paths:
+        try:
+            module = __import__(str(os.path.basename(path)[:-3]))
+        except ImportError:
+            continue
+        if name in _agents: return _agents[name]
+        if name in dir(module): return getattr(module, name)
+    return None
@@ -0,0 +1,181 @@
+# eightPuzzleTable.py
+# -------------------
+# Exact goal distances for every reachable eight puzzle (eightpuzzle.py).
+
+
+"""
+Only 9!/2 = 181,440 eight puzzles are reachable from the goal, so the exact
+distance of every one of them fits in a 181,440-byte table.  The table is built
+once by breadth-first search from the goal, saved next to the pattern databases
+(see patternDatabase.py) and memory-mapped on later runs.
+
+States are indexed by a perfect hash: the blank's cell times 8!/2 plus half
+the Lehmer-code rank of the other eight tiles.  Lexicographic ranks 2k and 2k+1
+differ by swapping the last two tiles, which flips the permutation's parity,
+and exactly the even permutations of the eight tiles are reachable.
+
+    table = getDistanceTable()
+    table.distance(puzzle)   # optimal number of moves
+    table.nextMove(puzzle)   # a move on an optimal path
+    table.solve(puzzle)      # a whole optimal path
+"""
+
+import mmap
+import os
+import random
+
+import eightpuzzle
+from patternDatabase import PDB_DIRECTORY, asTiles
+
+NUM_STATES = 181440
+HALF_RANKS = 20160 # 8! / 2, the even permutations of the eight tiles
+TABLE_FILE = '3x3-distances.bin'
+
+FACTORIALS = [1, 1, 2, 6, 24, 120, 720, 5040, 40320]
+
+def rankEightPuzzle(tiles):
+    """
+    Returns the index in 0..181439 of a solvable puzzle given as a list of
+    tiles.
+
+    >>> rankEightPuzzle([0, 1, 2, 3, 4, 5, 6, 7, 8])
+    0
+    >>> unrankEightPuzzle(rankEightPuzzle([1, 7, 8, 2, 3, 4, 5, 6, 0]))
+    [1, 7, 8, 2, 3, 4, 5, 6, 0]
+    """
+    numbers = [t for t in tiles if t != 0]
+    rank = 0
+    for i in range(8):
+        smaller = 0
+        for j in range(i + 1, 8):
+            if numbers[j] < numbers[i]: smaller += 1
+        rank += smaller * FACTORIALS[7 - i]
+    return list(tiles).index(0) * HALF_RANKS + rank // 2
+
+def unrankEightPuzzle(index):
+    "Returns the tile list of the puzzle with the given rankEightPuzzle index."
+    blank, half = divmod(index, HALF_RANKS)
+    for rank in (2 * half, 2 * half + 1):
+        remaining = list(range(1, 9))
+        numbers = []
+        for i in range(8):
+            digit, rank = divmod(rank, FACTORIALS[7 - i])
+            numbers.append(remaining.pop(digit))
+        if _isEven(numbers): break
+    numbers.insert(blank, 0)
+    return numbers
+
+def _isEven(numbers):
+    inversions = 0
+    for i in range(len(numbers)):
+        for j in range(i + 1, len(numbers)):
+            if numbers[i] > numbers[j]: inversions += 1
+    return inversions % 2 == 0
+
+def buildDistanceTable():
+    "Breadth-first search from the goal over packed puzzles; returns a bytearray."
+    goal = eightpuzzle.PackedEightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8])
+    distances = {goal.packed: 0}
+    frontier = [(goal.packed, goal.blank)]
+    depth = 0
+    while frontier:
+        depth += 1
+        nextFrontier = []
+        for packed, blank in frontier:
+            for move, target in eightpuzzle.BLANK_MOVES[blank]:
+                tile = (packed >> (4 * target)) & 15
+                successor = packed - (tile << (4 * target)) + (tile << (4 * blank))
+                if successor not in distances:
+                    distances[successor] = depth
+                    nextFrontier.append((successor, target))
+        frontier = nextFrontier
+
+    table = bytearray(NUM_STATES)
+    for packed, distance in distances.items():
+        table[rankEightPuzzle([(packed >> (4 * cell)) & 15 for cell in range(9)])] = distance
+    return table
+
+class EightPuzzleDistanceTable:
+    """
+    Answers optimal-distance queries about eight puzzles from the table in
+    path, which is built and saved first if it does not exist.  Puzzles may be
+    EightPuzzleStates, PackedEightPuzzleStates or tile lists, and must be
+    solvable.
+    """
+
+    def __init__(self, path=os.path.join(PDB_DIRECTORY, TABLE_FILE)):
+        if not os.path.exists(path) or os.path.getsize(path) != NUM_STATES:
+            directory = os.path.dirname(path)
+            if directory and not os.path.isdir(directory): os.makedirs(directory)
+            with open(path, 'wb') as f:
+                f.write(buildDistanceTable())
+        with open(path, 'rb') as f:
+            self.table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def distance(self, puzzle):
+        "The number of moves on an optimal path from puzzle to the goal."
+        return self.table[rankEightPuzzle(asTiles(puzzle))]
+
+    def nextMove(self, puzzle):
+        "A first move of an optimal path from puzzle, or None at the goal."
+        if isinstance(puzzle, (list, tuple)): puzzle = eightpuzzle.EightPuzzleState(list(puzzle))
+        distance = self.distance(puzzle)
+        if distance == 0: return None
+        for move in puzzle.legalMoves():
+            if self.distance(puzzle.result(move)) < distance:
+                return move
+
+    def solve(self, puzzle):
+        "Returns an optimal list of moves from puzzle to the goal."
+        if isinstance(puzzle, (list, tuple)): puzzle = eightpuzzle.EightPuzzleState(list(puzzle))
+        moves = []
+        move = self.nextMove(puzzle)
+        while move != None:
+            moves.append(move)
+            puzzle = puzzle.result(move)
+            move = self.nextMove(puzzle)
+        return moves
+
+    def maxDistance(self):
+        return max(self.table[:])
+
+    def statesAtDistance(self, distance):
+        "Returns the indices of all puzzles exactly distance moves from the goal."
+        indices = []
+        index = self.table.find(bytes([distance]))
+        while index != -1:
+            indices.append(index)
+            index = self.table.find(bytes([distance]), index + 1)
+        return indices
+
+    def randomPuzzleAtDistance(self, distance, rand=random):
+        "Returns a uniformly random tile list exactly distance moves from the goal."
+        indices = self.statesAtDistance(distance)
+        if len(indices) == 0:
+            raise Exception('No eight puzzle is %d moves from the goal' % distance)
+        return unrankEightPuzzle(rand.choice(indices))
+
+    def heuristic(self, state, problem=None):
+        "The exact goal distance, a perfect heuristic for aStarSearch."
+        return self.distance(state)
+
+_table = None
+
+def getDistanceTable():
+    "Returns the shared EightPuzzleDistanceTable, loading it on first use."
+    global _table
+    if _table == None:
+        _table = EightPuzzleDistanceTable()
+    return _table
+
+if __name__ == '__main__':
+    import time
+    start = time.time()
+    table = getDistanceTable()
+    print('Loaded distance table in %.2f seconds' % (time.time() - start))
+    print('Hardest puzzles are %d moves from the goal; there are %d of them' %
+          (table.maxDistance(), len(table.statesAtDistance(table.maxDistance()))))
+    puzzle = eightpuzzle.EightPuzzleState(table.randomPuzzleAtDistance(20))
+    print('A random puzzle 20 moves from the goal:')
+    print(puzzle)
+    print('Optimal solution: %s' % table.solve(puzzle))
@@ -145,6 +145,15 @@ class EightPuzzleState:
 
         return newPuzzle
 
+    def asList(self):
+        """
+          Returns the tiles in row-major order, the inverse of the constructor.
+
+        >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).asList()
+        [1, 0, 2, 3, 4, 5, 6, 7, 8]
+        """
+        return [tile for row in self.cells for tile in row]
+
     # Utilities for comparison and display
     def __eq__(self, other):
         """
@@ -183,20 +192,103 @@ class EightPuzzleState:
     def __str__(self):
         return self.__getAsciiString()
 
+# Blank moves for a PackedEightPuzzleState, precomputed per blank cell (0..8
+# in row-major order): BLANK_MOVES[cell] lists (move, newCell) pairs in the
+# order used by EightPuzzleState.legalMoves.  slidingPuzzle.py builds the
+# same tables for other board widths with blankMoves and reuses these for 3.
+def blankMoves(width=3):
+    table = []
+    for cell in range( width * width ):
+        row, col = divmod(cell, width)
+        moves = []
+        if(row != 0):
+            moves.append(('up', cell - width))
+        if(row != width - 1):
+            moves.append(('down', cell + width))
+        if(col != 0):
+            moves.append(('left', cell - 1))
+        if(col != width - 1):
+            moves.append(('right', cell + 1))
+        table.append(moves)
+    return table
+
+BLANK_MOVES = blankMoves()
+LEGAL_MOVES = [[move for move, _ in moves] for moves in BLANK_MOVES]
+MOVE_TARGETS = [dict(moves) for moves in BLANK_MOVES]
+
+class PackedEightPuzzleState:
+    """
+    An EightPuzzleState stored as a single integer, 4 bits per tile: the tile
+    in cell i (row-major) occupies bits 4*i to 4*i+3.  It has the same
+    isGoal, legalMoves, result and asList methods, so it can be used in
+    EightPuzzleSearchProblem in place of an EightPuzzleState, but result is
+    a few integer operations and hashing is hashing an int.
+
+    >>> PackedEightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left').isGoal()
+    True
+    """
+    __slots__ = ('packed', 'blank')
+
+    GOAL = sum([tile << (4 * tile) for tile in range(9)])
+
+    def __init__( self, numbers ):
+        """
+          Constructs a packed eight puzzle from an ordering of numbers, as
+        for EightPuzzleState.
+        """
+        self.packed = 0
+        for cell in range( 9 ):
+            self.packed |= numbers[cell] << (4 * cell)
+        self.blank = list(numbers).index(0)
+
+    def isGoal( self ):
+        return self.packed == PackedEightPuzzleState.GOAL
+
+    def legalMoves( self ):
+        "Returns the legal moves; the list is shared and must not be modified."
+        return LEGAL_MOVES[self.blank]
+
+    def result(self, move):
+        """
+          Returns a new PackedEightPuzzleState with the move applied.  Moving
+        the blank to cell c moves the tile in c into the blank's nibble,
+        which is zero.
+        """
+        target = MOVE_TARGETS[self.blank][move]
+        tile = (self.packed >> (4 * target)) & 15
+        newPuzzle = PackedEightPuzzleState.__new__(PackedEightPuzzleState)
+        newPuzzle.packed = self.packed - (tile << (4 * target)) + (tile << (4 * self.blank))
+        newPuzzle.blank = target
+        return newPuzzle
+
+    def asList(self):
+        return [(self.packed >> (4 * cell)) & 15 for cell in range( 9 )]
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedEightPuzzleState): return False
+        return self.packed == other.packed
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __str__(self):
+        return str(EightPuzzleState(self.asList()))
+
 # TODO: Implement The methods in this class
 
 class EightPuzzleSearchProblem(search.SearchProblem):
     """
       Implementation of a SearchProblem for the  Eight Puzzle domain
 
-      Each state is represented by an instance of an eightPuzzle.
+      Each state is represented by an instance of an eightPuzzle, either an
+      EightPuzzleState or a PackedEightPuzzleState.
     """
     def __init__(self,puzzle):
         "Creates a new EightPuzzleSearchProblem which stores search information."
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -248,14 +340,20 @@ def loadEightPuzzle(puzzleNumber):
     """
     return EightPuzzleState(EIGHT_PUZZLE_DATA[puzzleNumber])
 
-def createRandomEightPuzzle(moves=100):
+def createRandomEightPuzzle(moves=100, distance=None):
     """
       moves: number of random moves to apply
+      distance: if given, the exact optimal solution length wanted
 
       Creates a random eight puzzle by applying
       a series of 'moves' random moves to a solved
-      puzzle.
+      puzzle, or, if distance is given, draws one uniformly
+      from the puzzles exactly that many moves from the goal
+      (see eightPuzzleTable.py).
     """
+    if distance != None:
+        import eightPuzzleTable
+        return EightPuzzleState(eightPuzzleTable.getDistanceTable().randomPuzzleAtDistance(distance))
     puzzle = EightPuzzleState([0,1,2,3,4,5,6,7,8])
     for i in range(moves):
         # Execute a random legal move
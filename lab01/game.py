@@ -226,6 +226,19 @@ class Grid:
                 if self[x][y] == key: list.append( (x,y) )
         return list
 
+    def asBitmask(self):
+        """
+        Returns the grid as a single int with bit (x * height + y) set for
+        every True cell, the same cell order used by packBits.
+        """
+        mask = 0
+        bit = 1
+        for column in self.data:
+            for cell in column:
+                if cell: mask |= bit
+                bit <<= 1
+        return mask
+
     def packBits(self):
         """
         Returns an efficient int list representation
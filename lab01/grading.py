@@ -15,22 +15,25 @@
 "Common code for autograders"
 
 import html
+import io
 import time
 import sys
 import json
+import multiprocessing
+import random
 import traceback
-import pdb
 from collections import defaultdict
 import util
 
 class Grades:
   "A data structure for project grades, along with formatting code to display them"
   def __init__(self, projectName, questionsAndMaxesList,
-               gsOutput=False, edxOutput=False, muteOutput=False):
+               gsOutput=False, edxOutput=False, muteOutput=False, jobs=1):
     """
     Defines the grading scheme for a project
       projectName: project name
       questionsAndMaxesDict: a list of (question name, max points per question)
+      jobs: number of worker processes grading questions concurrently
     """
     self.questions = [el[0] for el in questionsAndMaxesList]
     self.maxes = dict(questionsAndMaxesList)
@@ -39,11 +42,13 @@ class Grades:
     self.project = projectName
     self.start = time.localtime()[1:6]
     self.sane = True # Sanity checks
+    self.timings = [] # one dict per test case run, see timeTest
     self.currentQuestion = None # Which question we're grading
     self.edxOutput = edxOutput
     self.gsOutput = gsOutput  # GradeScope output
     self.mute = muteOutput
     self.prereqs = defaultdict(set)
+    self.jobs = jobs
 
     #print('Autograder transcript for %s' % self.project)
     print('Starting on %d-%d at %d:%02d:%02d' % self.start)
@@ -58,6 +63,10 @@ class Grades:
     """
 
     completedQuestions = set([])
+    # Every question starts from this random state, graded serially or in a
+    # worker, so its results do not depend on the questions graded before it
+    randomState = random.getstate()
+    pool, pending = self.startWorkers(gradingModule, exceptionMap, randomState)
     for q in self.questions:
       print('\nQuestion %s' % q)
       print('=' * (9 + len(q)))
@@ -73,23 +82,21 @@ class Grades:
 """ % (prereq, q, q, prereq))
           continue
 
-      if self.mute: util.mutePrint()
-      try:
-        util.TimeoutFunction(getattr(gradingModule, q),1800)(self) # Call the question's function
-        #TimeoutFunction(getattr(gradingModule, q),1200)(self) # Call the question's function
-      except Exception as inst:
-        self.addExceptionMessage(q, inst, traceback)
-        self.addErrorHints(exceptionMap, inst, q[1])
-      except:
-        self.fail('FAIL: Terminated with a string exception.')
-      finally:
-        if self.mute: util.unmutePrint()
+      if pool == None:
+        random.setstate(randomState)
+        self.runQuestion(gradingModule, q, exceptionMap)
+      else:
+        self.collectQuestion(q, pending[q])
 
       if self.points[q] >= self.maxes[q]:
         completedQuestions.add(q)
+        if pool != None: self.dispatchQuestions(pool, pending, completedQuestions)
 
       print('\n### Question %s: %d/%d ###\n' % (q, self.points[q], self.maxes[q]))
 
+    if pool != None:
+      pool.terminate()
+      pool.join()
 
     print('\nFinished at %d:%02d:%02d' % time.localtime()[3:6])
     print("\nProvisional grades\n==================")
@@ -141,6 +148,59 @@ to follow your instructor's guidelines to receive credit on your project.
     if self.gsOutput:
         self.produceGradeScopeOutput()
 
+  def runQuestion(self, gradingModule, q, exceptionMap):
+    "Calls the grading function of question q, which must be the current question"
+    if self.mute: util.mutePrint()
+    try:
+      util.TimeoutFunction(getattr(gradingModule, q),1800)(self) # Call the question's function
+      #TimeoutFunction(getattr(gradingModule, q),1200)(self) # Call the question's function
+    except Exception as inst:
+      self.addExceptionMessage(q, inst, traceback)
+      self.addErrorHints(exceptionMap, inst, q[1])
+    except:
+      self.fail('FAIL: Terminated with a string exception.')
+    finally:
+      if self.mute: util.unmutePrint()
+
+  def startWorkers(self, gradingModule, exceptionMap, randomState):
+    """
+    With more than one job and CPU, starts a pool of forked workers and
+    sends it the questions without prerequisites.  Returns the pool and a
+    dict of pending results by question, which dispatchQuestions extends as
+    questions pass.  Questions are still reported in order by grade().
+    """
+    global _workerContext
+    # More workers than CPUs only add forking and switching to the critical
+    # path, which is never shorter than the slowest question
+    workers = min(self.jobs, len(self.questions), multiprocessing.cpu_count())
+    if workers < 2: return None, {}
+    if 'fork' not in multiprocessing.get_all_start_methods(): return None, {}
+    _workerContext = (self.mute, gradingModule, exceptionMap, randomState)
+    pool = multiprocessing.get_context('fork').Pool(workers)
+    pending = {}
+    self.dispatchQuestions(pool, pending, set())
+    return pool, pending
+
+  def dispatchQuestions(self, pool, pending, completedQuestions):
+    """
+    Sends the pool every question not yet sent whose prerequisites have all
+    passed.  A question whose prerequisite fails is never graded, as in a
+    serial run, so no worker time is spent on it.
+    """
+    for q in self.questions:
+      if q not in pending and self.prereqs[q].issubset(completedQuestions):
+        pending[q] = pool.apply_async(_gradeQuestionInWorker, (q,))
+
+  def collectQuestion(self, q, result):
+    "Prints the output of question q graded in a worker and merges its grades"
+    try:
+      output, calls = result.get()
+    except Exception as inst:
+      self.addExceptionMessage(q, inst, traceback)
+      return
+    sys.stdout.write(output)
+    self.replay(calls)
+
   def addExceptionMessage(self, q, inst, traceback):
     """
     Method to format the exception message, this is more complicated because
@@ -148,7 +208,9 @@ to follow your instructor's guidelines to receive credit on your project.
     """
     self.fail('FAIL: Exception raised: %s' % inst)
     self.addMessage('')
-    for line in traceback.format_exc().split('\n'):
+    # Exceptions replayed from a test case run in a worker carry its traceback
+    formatted = getattr(inst, 'workerTraceback', None) or traceback.format_exc()
+    for line in formatted.split('\n'):
         self.addMessage(line)
 
   def addErrorHints(self, exceptionMap, errorInstance, questionNum):
@@ -301,8 +363,165 @@ to follow your instructor's guidelines to receive credit on your project.
       #print('%%% ' + line + ' %%%')
       #self.messages[self.currentQuestion].append(line)
 
+  def timeTest(self, test, function):
+    """
+    Calls function, which runs test case test, and records its wall and CPU
+    time in seconds and the peak resident memory of the process while it
+    ran, in kilobytes (None where the peak cannot be reset, as off Linux).
+    """
+    memoryTracked = resetPeakMemory()
+    wallStart, cpuStart = time.perf_counter(), time.process_time()
+    try:
+      return function()
+    finally:
+      self.addTiming({'test': test,
+                      'wall': time.perf_counter() - wallStart,
+                      'cpu': time.process_time() - cpuStart,
+                      'peakMemoryKB': memoryTracked and peakMemory() or None})
+
+  def addTiming(self, timing):
+    timing = dict(timing)
+    timing['question'] = self.currentQuestion
+    self.timings.append(timing)
+
+  def timingReport(self):
+    return {'project': self.project,
+            'tests': self.timings,
+            'wall': sum([t['wall'] for t in self.timings]),
+            'cpu': sum([t['cpu'] for t in self.timings])}
+
+  def writeTimingReport(self, path):
+    with open(path, 'w') as f:
+      json.dump(self.timingReport(), f, indent=2, sort_keys=True)
+
+  def replay(self, calls):
+    """
+    Applies the grade changes recorded by a GradesRecorder to the current
+    question, without printing the messages a second time.
+    """
+    for call in calls:
+      if call[0] == 'addMessage':
+        message, raw = call[1:]
+        if not raw:
+          message = html.escape(message)
+        self.messages[self.currentQuestion].append(message)
+      elif call[0] == 'fail':
+        self.sane = False
+        self.assignZeroCredit()
+      else:
+        getattr(self, call[0])(*call[1:])
+
+
+class GradesRecorder(Grades):
+  """
+  Stands in for Grades while a question or test case runs in a worker process.
+  Messages are written to out, and every change to the grades is recorded so
+  the parent process can apply them with Grades.replay in the order of a
+  serial run.
+  """
+  def __init__(self, out, mute=False):
+    # Grades.__init__ is not called: there is no banner and no point table
+    self.out = out
+    self.mute = mute
+    self.calls = []
+    self.currentQuestion = None
+    self.sane = True
+
+  def fail(self, message, raw=False):
+    self.calls.append(('fail',))
+    self.addMessage(message, raw)
 
+  def assignZeroCredit(self):
+    self.calls.append(('assignZeroCredit',))
 
+  def addPoints(self, amt):
+    self.calls.append(('addPoints', amt))
+
+  def deductPoints(self, amt):
+    self.calls.append(('deductPoints', amt))
+
+  def assignFullCredit(self, message="", raw=False):
+    self.calls.append(('assignFullCredit',))
+    if message != "":
+      self.addMessage(message, raw)
+
+  def addMessage(self, message, raw=False):
+    if not raw:
+      self.out.write('*** ' + message + '\n')
+    self.calls.append(('addMessage', message, raw))
+
+  def addTiming(self, timing):
+    self.calls.append(('addTiming', timing))
+
+  def addMessageToEmail(self, message):
+    self.out.write("WARNING**** addMessageToEmail is deprecated %s\n" % message)
+
+
+
+
+
+def resetPeakMemory():
+  """
+  Restarts the peak resident set size of this process from its current size,
+  through Linux's /proc/self/clear_refs.  Returns whether that was possible.
+  """
+  try:
+    with open('/proc/self/clear_refs', 'w') as f:
+      f.write('5')
+    return True
+  except (IOError, OSError):
+    return False
+
+def peakMemory():
+  """
+  The peak resident set size of this process in kilobytes since it started
+  or since the last resetPeakMemory, or None if /proc/self/status is missing.
+  """
+  try:
+    with open('/proc/self/status') as f:
+      for line in f:
+        if line.startswith('VmHWM:'):
+          return int(line.split()[1])
+  except (IOError, OSError):
+    pass
+  return None
+
+def loadTimingReport(path):
+  with open(path) as f:
+    return json.load(f)
+
+def timingRegressions(baseline, report, threshold=0.25, minSeconds=0.05):
+  """
+  Compares two timing reports and returns (test, baseline seconds, seconds)
+  for each test whose wall time grew by more than the fraction threshold.
+  Tests that take under minSeconds are ignored, as their times are mostly
+  noise, and so are tests missing from the baseline.
+  """
+  before = dict([(t['test'], t['wall']) for t in baseline['tests']])
+  regressions = []
+  for timing in report['tests']:
+    test, wall = timing['test'], timing['wall']
+    if test not in before or wall < minSeconds: continue
+    if wall > before[test] * (1 + threshold):
+      regressions.append((test, before[test], wall))
+  return regressions
+
+
+# Worker processes for Grades.startWorkers.  They are forked, so they inherit
+# the grading module and the loaded student code; only question names go to
+# them and only output and recorded grade changes come back.
+_workerContext = None
+
+def _gradeQuestionInWorker(q):
+  mute, gradingModule, exceptionMap, randomState = _workerContext
+  # The random state of grade(), as a serial run gives every question
+  random.setstate(randomState)
+  out = io.StringIO()
+  recorder = GradesRecorder(out, mute)
+  recorder.currentQuestion = q
+  sys.stdout = out
+  recorder.runQuestion(gradingModule, q, exceptionMap)
+  return out.getvalue(), recorder.calls
 
 
 class Counter(dict):
@@ -153,7 +153,14 @@ class InfoPane:
 
 
 class PacmanGraphics:
-    def __init__(self, zoom=1.0, frameTime=0.0, capture=False):
+    """
+    Draws each move as the game makes it, animating Pacman over frameTime
+    seconds.  With fps set, update only records what changed; at most fps
+    times a second the display catches up, redrawing just the agents that
+    moved and the food and capsules eaten since the last frame, so the game
+    runs at full speed while the display samples it.
+    """
+    def __init__(self, zoom=1.0, frameTime=0.0, capture=False, fps=None):
         self.have_window = 0
         self.currentGhostImages = {}
         self.pacmanImage = None
@@ -161,6 +168,7 @@ class PacmanGraphics:
         self.gridSize = DEFAULT_GRID_SIZE * zoom
         self.capture = capture
         self.frameTime = frameTime
+        self.fps = fps
 
     def checkNullDisplay(self):
         return False
@@ -186,6 +194,13 @@ class PacmanGraphics:
         self.infoPane = InfoPane(layout, self.gridSize)
         self.currentState = layout
 
+        # Changes not drawn yet when skipping frames
+        self.movedAgents = {} # agent index -> latest agent state
+        self.eatenFood = []
+        self.eatenCapsules = []
+        self.latestState = None
+        self.lastFrame = time.time()
+
     def drawDistributions(self, state):
         walls = state.layout.walls
         dist = []
@@ -234,6 +249,11 @@ class PacmanGraphics:
         refresh()
 
     def update(self, newState):
+        if self.fps != None:
+            self.recordChanges(newState)
+            if time.time() - self.lastFrame >= 1.0 / self.fps:
+                self.drawFrame()
+            return
         agentIndex = newState._agentMoved
         agentState = newState.agentStates[agentIndex]
 
@@ -253,6 +273,47 @@ class PacmanGraphics:
         if 'ghostDistances' in dir(newState):
             self.infoPane.updateGhostDistances(newState.ghostDistances)
 
+    def recordChanges(self, newState):
+        "Notes the changes in newState, the result of one move, for drawFrame"
+        agentIndex = newState._agentMoved
+        self.movedAgents[agentIndex] = newState.agentStates[agentIndex]
+        if newState._foodEaten != None:
+            self.eatenFood.append(newState._foodEaten)
+        if newState._capsuleEaten != None:
+            self.eatenCapsules.append(newState._capsuleEaten)
+        self.latestState = newState
+
+    def drawFrame(self):
+        """
+          Brings the display up to date with the changes recorded since the
+        last frame, without animation, and refreshes the window once.
+        """
+        if self.latestState == None: return
+        for agentIndex, agentState in self.movedAgents.items():
+            if self.agentImages[agentIndex][0].isPacman != agentState.isPacman: self.swapImages(agentIndex, agentState)
+            prevState, image = self.agentImages[agentIndex]
+            if agentState.isPacman:
+                position = self.getPosition(agentState)
+                endpoints = self.getEndpoints(self.getDirection(agentState), position)
+                moveCircle(image[0], self.to_screen(position), PACMAN_SCALE * self.gridSize, endpoints)
+            else:
+                self.placeGhost(agentState, agentIndex, prevState, image)
+            self.agentImages[agentIndex] = (agentState, image)
+        for cell in self.eatenFood:
+            self.removeFood(cell, self.food)
+        for cell in self.eatenCapsules:
+            self.removeCapsule(cell, self.capsules)
+        self.infoPane.updateScore(self.latestState.score)
+        if 'ghostDistances' in dir(self.latestState):
+            self.infoPane.updateGhostDistances(self.latestState.ghostDistances)
+        refresh()
+
+        self.movedAgents = {}
+        self.eatenFood = []
+        self.eatenCapsules = []
+        self.latestState = None
+        self.lastFrame = time.time()
+
     def make_window(self, width, height):
         grid_width = (width-1) * self.gridSize
         grid_height = (height-1) * self.gridSize
@@ -402,6 +463,16 @@ class PacmanGraphics:
         self.moveEyes(self.getPosition(ghost), self.getDirection(ghost), ghostImageParts[-4:])
         refresh()
 
+    def placeGhost(self, ghost, ghostIndex, prevGhost, ghostImageParts):
+        "moveGhost without the refreshes, for drawFrame"
+        old_x, old_y = self.to_screen(self.getPosition(prevGhost))
+        new_x, new_y = self.to_screen(self.getPosition(ghost))
+        for ghostImagePart in ghostImageParts:
+            move_by(ghostImagePart, (new_x - old_x, new_y - old_y))
+        color = self.getGhostColor(ghost, ghostIndex)
+        edit(ghostImageParts[0], ('fill', color), ('outline', color))
+        self.moveEyes(self.getPosition(ghost), self.getDirection(ghost), ghostImageParts[-4:])
+
     def getPosition(self, agentState):
         if agentState.configuration == None: return (-1000, -1000)
         return agentState.getPosition()
@@ -411,6 +482,8 @@ class PacmanGraphics:
         return agentState.configuration.getDirection()
 
     def finish(self):
+        if self.fps != None:
+            self.drawFrame()
         end_graphics()
 
     def to_screen(self, point):
@@ -0,0 +1,209 @@
+# patternDatabase.py
+# ------------------
+# Additive pattern-database heuristics for the eight puzzle (eightpuzzle.py)
+# and larger sliding puzzles.
+
+
+"""
+A pattern database (PDB) stores, for one group of tiles, the exact number of
+moves of those tiles needed to bring them home, whatever the other tiles do.
+The tables are built once by a backward breadth-first search from the goal and
+saved as raw byte arrays, so the heuristic is a handful of table lookups.
+
+The tile groups of a partition are disjoint and each table only counts moves
+of its own tiles, so the values of all groups can be added and the sum is
+still admissible and consistent.  Partitioning into single tiles gives the
+Manhattan distance.
+
+Puzzles are width x width boards given as a row-major list of tiles with 0 for
+the blank, and the goal is [0, 1, 2, ..., width*width - 1] as in eightpuzzle.py.
+States may be such lists or tuples, or any object with an asList() method such
+as EightPuzzleState:
+
+    search.aStarSearch(EightPuzzleSearchProblem(puzzle), pdbHeuristic)
+
+Run this file to benchmark the PDB heuristic against Manhattan distance on
+random solvable eight puzzles:
+
+> python patternDatabase.py -n 20
+"""
+
+import collections
+import os
+import random
+import time
+
+from slidingPuzzle import neighbours, randomSolvableTiles
+
+PDB_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb')
+
+UNKNOWN = 255 # table entry for tile positions that cannot occur
+
+def defaultPartition(width):
+    "Splits the tiles of a width x width puzzle into groups of four in order."
+    tiles = list(range(1, width * width))
+    return [tiles[i:i+4] for i in range(0, len(tiles), 4)]
+
+def asTiles(state):
+    if isinstance(state, (list, tuple)): return state
+    return state.asList()
+
+class PatternDatabase:
+    """
+    The goal distance of one group of tiles (the pattern), counting only moves
+    of pattern tiles.
+
+    table is a bytearray with one entry per placement of the pattern tiles:
+    the entry for pattern tile i at cell p_i is at index sum(p_i * cells**i).
+    Placements that cannot occur hold UNKNOWN.
+    """
+
+    def __init__(self, width, pattern, table=None):
+        self.width = width
+        self.cells = width * width
+        self.pattern = tuple(pattern)
+        self.weights = [self.cells ** i for i in range(len(self.pattern))]
+        if table == None: table = self.build()
+        self.table = table
+
+    def build(self):
+        """
+        Backward 0-1 breadth-first search from the goal over (pattern tile
+        cells, blank cell); sliding a pattern tile costs 1 and any other tile
+        costs 0.  Each placement keeps the cheapest cost over blank cells.
+        """
+        cells, weights = self.cells, self.weights
+        adjacent = neighbours(self.width)
+        distance = bytearray([UNKNOWN]) * (cells * cells ** len(self.pattern))
+
+        goalIndex = sum(tile * w for tile, w in zip(self.pattern, weights))
+        start = goalIndex * cells # blank in cell 0
+        distance[start] = 0
+        fringe = collections.deque([start])
+        while fringe:
+            code = fringe.popleft()
+            cost = distance[code]
+            index, blank = divmod(code, cells)
+            for cell in adjacent[blank]:
+                # Find whether a pattern tile sits on the cell the blank moves to
+                rest, moved = index, None
+                for w in weights:
+                    rest, position = divmod(rest, cells)
+                    if position == cell:
+                        moved = w
+                        break
+                if moved == None:
+                    successor, successorCost = index * cells + cell, cost
+                else:
+                    successor, successorCost = (index + (blank - cell) * moved) * cells + cell, cost + 1
+                if successorCost < distance[successor]:
+                    distance[successor] = successorCost
+                    if successorCost == cost:
+                        fringe.appendleft(successor)
+                    else:
+                        fringe.append(successor)
+
+        table = bytearray(len(distance) // cells)
+        for index in range(len(table)):
+            table[index] = min(distance[index * cells:(index + 1) * cells])
+        return table
+
+    def lookup(self, positions):
+        "positions[tile] is the cell holding tile."
+        index = 0
+        for tile, w in zip(self.pattern, self.weights):
+            index += positions[tile] * w
+        return self.table[index]
+
+    def fileName(self):
+        return '%dx%d-%s.pdb' % (self.width, self.width, '-'.join([str(t) for t in self.pattern]))
+
+    def save(self, directory=PDB_DIRECTORY):
+        if not os.path.isdir(directory): os.makedirs(directory)
+        with open(os.path.join(directory, self.fileName()), 'wb') as f:
+            f.write(self.table)
+
+def loadPatternDatabase(width, pattern, directory=PDB_DIRECTORY):
+    """
+    Reads the table for pattern from directory, building and saving it first
+    if it is missing or has the wrong size.
+    """
+    database = PatternDatabase(width, pattern, table=bytearray())
+    path = os.path.join(directory, database.fileName())
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            database.table = bytearray(f.read())
+    if len(database.table) != database.cells ** len(database.pattern):
+        database.table = database.build()
+        database.save(directory)
+    return database
+
+class AdditivePatternDatabase:
+    """
+    The sum of the PatternDatabases of a partition of the tiles into disjoint
+    groups; defaultPartition(width) if none is given.
+    """
+
+    def __init__(self, width, partition=None, directory=PDB_DIRECTORY):
+        if partition == None: partition = defaultPartition(width)
+        tiles = sorted([t for group in partition for t in group])
+        if tiles != list(range(1, width * width)):
+            raise Exception('Partition must contain each tile 1..%d exactly once' % (width * width - 1))
+        self.width = width
+        self.databases = [loadPatternDatabase(width, group, directory) for group in partition]
+
+    def heuristic(self, state, problem=None):
+        "An admissible, consistent heuristic for aStarSearch."
+        positions = [0] * (self.width * self.width)
+        for cell, tile in enumerate(asTiles(state)):
+            positions[tile] = cell
+        total = 0
+        for database in self.databases:
+            total += database.lookup(positions)
+        return total
+
+_databases = {}
+
+def getPatternDatabase(width=3, partition=None):
+    "Returns the shared AdditivePatternDatabase for width and partition."
+    if partition == None: partition = defaultPartition(width)
+    key = (width, tuple([tuple(group) for group in partition]))
+    if key not in _databases:
+        _databases[key] = AdditivePatternDatabase(width, partition)
+    return _databases[key]
+
+def pdbHeuristic(state, problem=None):
+    "The default additive pattern database heuristic for the state's board size."
+    tiles = asTiles(state)
+    width = int(round(len(tiles) ** 0.5))
+    return getPatternDatabase(width).heuristic(tiles)
+
+if __name__ == '__main__':
+    import optparse
+    import search
+    import searchTrace
+    from eightpuzzle import EightPuzzleState, EightPuzzleSearchProblem
+
+    parser = optparse.OptionParser(description = 'Benchmark pattern databases on random eight puzzles')
+    parser.add_option('-n', '--puzzles', dest = 'puzzles', type = 'int', default = 20,
+                      help = 'number of random solvable puzzles')
+    parser.add_option('-s', '--seed', dest = 'seed', type = 'int', default = 0,
+                      help = 'random seed')
+    options, _ = parser.parse_args()
+
+    start = time.time()
+    heuristics = [('manhattan', AdditivePatternDatabase(3, [[t] for t in range(1, 9)]).heuristic),
+                  ('pdb', getPatternDatabase(3).heuristic)]
+    print('Loaded pattern databases in %.2f seconds' % (time.time() - start))
+
+    rand = random.Random(options.seed)
+    puzzles = [EightPuzzleState(randomSolvableTiles(3, rand)) for i in range(options.puzzles)]
+    for name, heuristic in heuristics:
+        expanded, elapsed, length = 0, 0.0, 0
+        for puzzle in puzzles:
+            actions, trace = searchTrace.traceSearch(search.aStarSearch, EightPuzzleSearchProblem(puzzle), heuristic)
+            expanded += trace.expanded
+            elapsed += trace.searchTime
+            length += len(actions)
+        print('%-10s mean solution %5.1f moves, %8.1f nodes expanded, %.4f seconds per puzzle' %
+              (name, float(length) / len(puzzles), float(expanded) / len(puzzles), elapsed / len(puzzles)))
@@ -187,9 +187,52 @@ def aStarSearch(problem, heuristic=nullHeuristic):
 
     return []
 
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic):
+    """
+    Repeated depth-first searches that cut off nodes whose cost plus heuristic
+    exceeds a bound, raising the bound each time to the smallest value that
+    was cut off.  Memory grows only with the path length, which suits puzzles
+    whose A* frontier does not fit in memory.  States on the current path are
+    not revisited.
+    """
+    start = problem.getStartState()
+    onPath = set([start])
+    actions = []
+
+    def boundedSearch(state, g, bound):
+        # Returns None once a goal is found, else the smallest f above bound
+        f = g + heuristic(state, problem)
+        if f > bound:
+            return f
+        if problem.isGoalState(state):
+            return None
+        smallest = float('inf')
+        for successor, action, stepCost in problem.getSuccessors(state):
+            if successor in onPath:
+                continue
+            onPath.add(successor)
+            actions.append(action)
+            t = boundedSearch(successor, g + stepCost, bound)
+            if t == None:
+                return None
+            smallest = min(smallest, t)
+            actions.pop()
+            onPath.remove(successor)
+        return smallest
+
+    bound = heuristic(start, problem)
+    while True:
+        t = boundedSearch(start, 0, bound)
+        if t == None:
+            return actions
+        if t == float('inf'):
+            return []
+        bound = t
+
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+idastar = iterativeDeepeningAStarSearch
@@ -39,9 +39,13 @@ from game import Agent
 from game import Actions
 import util
 import time
+import collections
 import search
+import searchTrace
 from copy import deepcopy
+from agentRegistry import registerAgent
 
+@registerAgent
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
 
@@ -57,6 +61,7 @@ class GoWestAgent(Agent):
 #       after you fill in parts of search.py          #
 #######################################################
 
+@registerAgent
 class SearchAgent(Agent):
     """
     This very general search agent finds a path using a supplied search
@@ -70,11 +75,17 @@ class SearchAgent(Agent):
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
 
+    Passing trace=<file> records the search with searchTrace.py and writes the
+    statistics to that file as JSON.
 
-    Note: You should NOT change any code in SearchAgent
+    Note: SearchAgent is support code rather than part of the assignment, so
+    you should not need to change it for your answers.
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    heuristic = None
+    traceFile = None
+
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', trace=None):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
@@ -93,13 +104,15 @@ class SearchAgent(Agent):
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.heuristic = heur
+            self.searchFunction = lambda x, heuristic=heur: func(x, heuristic=heuristic)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
             raise AttributeError(prob + ' is not a search problem type in SearchAgents.py.')
         self.searchType = globals()[prob]
         print('[SearchAgent] using problem type ' + prob)
+        self.traceFile = trace
 
     def registerInitialState(self, state):
         """
@@ -113,10 +126,18 @@ class SearchAgent(Agent):
         if self.searchFunction == None: raise Exception("No search function provided for SearchAgent")
         starttime = time.time()
         problem = self.searchType(state) # Makes a new search problem
-        self.actions  = self.searchFunction(problem) # Find a path
+        if self.traceFile == None:
+            self.actions  = self.searchFunction(problem) # Find a path
+        else:
+            self.actions, trace = searchTrace.traceSearch(self.searchFunction, problem, self.heuristic)
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if getattr(problem, 'heuristicInfo', None) != None:
+            for cache in heuristicCaches(problem): print(cache)
+        if self.traceFile != None:
+            print(trace)
+            trace.writeJSON(self.traceFile)
 
     def getAction(self, state):
         """
@@ -227,6 +248,7 @@ class PositionSearchProblem(search.SearchProblem):
             cost += self.costFn((x,y))
         return cost
 
+@registerAgent
 class StayEastSearchAgent(SearchAgent):
     """
     An agent for position search with a cost function that penalizes being in
@@ -239,6 +261,7 @@ class StayEastSearchAgent(SearchAgent):
         costFn = lambda pos: .5 ** pos[0]
         self.searchType = lambda state: PositionSearchProblem(state, costFn, (1, 1), None, False)
 
+@registerAgent
 class StayWestSearchAgent(SearchAgent):
     """
     An agent for position search with a cost function that penalizes being in
@@ -263,6 +286,66 @@ def euclideanHeuristic(position, problem, info={}):
     xy2 = problem.goal
     return ( (xy1[0] - xy2[0]) ** 2 + (xy1[1] - xy2[1]) ** 2 ) ** 0.5
 
+class HeuristicCache:
+    "A bounded least-recently-used map from search states to heuristic values."
+
+    def __init__(self, name, maxSize):
+        self.name = name
+        self.maxSize = maxSize
+        self.values = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def hitRate(self):
+        calls = self.hits + self.misses
+        if calls == 0: return 0.0
+        return float(self.hits) / calls
+
+    def __str__(self):
+        return 'Heuristic cache %s: %d hits, %d misses (%.1f%% hit rate), %d entries' % \
+               (self.name, self.hits, self.misses, 100 * self.hitRate(), len(self.values))
+
+def memoizeHeuristic(heuristic=None, maxSize=100000):
+    """
+    Decorator caching a heuristic that is a pure function of the search state.
+    Values are kept per problem in an LRU HeuristicCache of at most maxSize
+    states, stored in problem.heuristicInfo, so states regenerated from a
+    different parent are looked up instead of recomputed.
+
+    Use as @memoizeHeuristic or @memoizeHeuristic(maxSize=1000).
+    """
+    if heuristic == None:
+        return lambda heuristic: memoizeHeuristic(heuristic, maxSize)
+    key = ('memoizeHeuristic', heuristic.__name__)
+
+    def memoized(state, problem):
+        # getattr, unlike dir(), also sees the heuristicInfo of the problem a
+        # searchTrace.TracedSearchProblem forwards to, and is cheap per call
+        info = getattr(problem, 'heuristicInfo', None)
+        if info == None: info = problem.heuristicInfo = {}
+        cache = info.get(key)
+        if cache == None:
+            cache = info[key] = HeuristicCache(heuristic.__name__, maxSize)
+        values = cache.values
+        if state in values:
+            cache.hits += 1
+            values.move_to_end(state)
+            return values[state]
+        cache.misses += 1
+        value = heuristic(state, problem)
+        values[state] = value
+        if len(values) > cache.maxSize:
+            values.popitem(last=False)
+        return value
+
+    memoized.__name__ = heuristic.__name__
+    memoized.__doc__ = heuristic.__doc__
+    return memoized
+
+def heuristicCaches(problem):
+    "Returns the HeuristicCaches that memoizeHeuristic stored for problem."
+    return [v for v in problem.heuristicInfo.values() if isinstance(v, HeuristicCache)]
+
 #####################################################
 # This portion is incomplete.  Time to write code!  #
 #####################################################
@@ -286,6 +369,7 @@ class CornersProblem(search.SearchProblem):
             if not startingGameState.hasFood(*corner):
                 print('Warning: no food in corner ' + str(corner))
         self._expanded = 0 # DO NOT CHANGE; Number of search nodes expanded
+        self.heuristicInfo = {} # A dictionary for the heuristic to store information
         # Please add any code here which you would like to use
         # in initializing the problem
         "*** YOUR CODE HERE ***"
@@ -362,6 +446,7 @@ class CornersProblem(search.SearchProblem):
         return len(actions)
 
 
+@memoizeHeuristic
 def cornersHeuristic(state, problem):
     """
     A heuristic for the CornersProblem that you defined.
@@ -385,23 +470,81 @@ def cornersHeuristic(state, problem):
 
     return max(hvalue)
 
+@registerAgent
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
-    def __init__(self):
-        self.searchFunction = lambda prob: search.aStarSearch(prob, cornersHeuristic)
-        self.searchType = CornersProblem
+    def __init__(self, trace=None, **kwargs):
+        SearchAgent.__init__(self, 'aStarSearch', 'CornersProblem', 'cornersHeuristic', trace=trace, **kwargs)
+
+class FoodMask:
+    """
+    An immutable, hashable set of food positions packed into a single int,
+    with bit (x * height + y) set for every remaining dot (see Grid.asBitmask).
+
+    Successor states that do not eat a dot share their parent's FoodMask, so
+    generating them costs no copying.
+    """
+    __slots__ = ('bits', 'width', 'height')
+
+    def __init__(self, bits, width, height):
+        self.bits = bits
+        self.width = width
+        self.height = height
+
+    def __eq__(self, other):
+        if not isinstance(other, FoodMask): return False
+        return self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __str__(self):
+        return str(self.asGrid())
+
+    def hasFood(self, x, y):
+        return (self.bits >> (x * self.height + y)) & 1 == 1
+
+    def without(self, x, y):
+        "Returns the mask with (x,y) eaten; the same object if (x,y) has no food."
+        bit = 1 << (x * self.height + y)
+        if not self.bits & bit: return self
+        return FoodMask(self.bits ^ bit, self.width, self.height)
+
+    def isEmpty(self):
+        return self.bits == 0
+
+    def count(self):
+        return bin(self.bits).count('1')
+
+    def asList(self):
+        "Returns the food positions in the same order as Grid.asList."
+        list = []
+        bits, index = self.bits, 0
+        while bits:
+            if bits & 1: list.append(divmod(index, self.height))
+            bits >>= 1
+            index += 1
+        return list
+
+    def asGrid(self):
+        from game import Grid
+        grid = Grid(self.width, self.height)
+        for x, y in self.asList():
+            grid[x][y] = True
+        return grid
 
 class FoodSearchProblem:
     """
     A search problem associated with finding the a path that collects all of the
     food (dots) in a Pacman game.
 
-    A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
+    A search state in this problem is a tuple ( pacmanPosition, foodMask ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
-      foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+      foodMask:       a FoodMask of the remaining food
     """
     def __init__(self, startingGameState):
-        self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
+        food = startingGameState.getFood()
+        self.start = (startingGameState.getPacmanPosition(), FoodMask(food.asBitmask(), food.width, food.height))
         self.walls = startingGameState.getWalls()
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
@@ -411,20 +554,18 @@ class FoodSearchProblem:
         return self.start
 
     def isGoalState(self, state):
-        return state[1].count() == 0
+        return state[1].isEmpty()
 
     def getSuccessors(self, state):
         "Returns successor states, the actions they require, and a cost of 1."
         successors = []
         self._expanded += 1 # DO NOT CHANGE
+        (x, y), food = state
         for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state[0]
             dx, dy = Actions.directionToVector(direction)
             nextx, nexty = int(x + dx), int(y + dy)
             if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
+                successors.append( ( ((nextx, nexty), food.without(nextx, nexty)), direction, 1) )
         return successors
 
     def getCostOfActions(self, actions):
@@ -441,12 +582,13 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+@registerAgent
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
-    def __init__(self):
-        self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
-        self.searchType = FoodSearchProblem
+    def __init__(self, trace=None, **kwargs):
+        SearchAgent.__init__(self, 'aStarSearch', 'FoodSearchProblem', 'foodHeuristic', trace=trace, **kwargs)
 
+@memoizeHeuristic
 def foodHeuristic(state, problem):
     """
     Your heuristic for the FoodSearchProblem goes here.
@@ -460,9 +602,10 @@ def foodHeuristic(state, problem):
     other hand, inadmissible or inconsistent heuristics may find optimal
     solutions, so be careful.
 
-    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a Grid
-    (see game.py) of either True or False. You can call foodGrid.asList() to get
-    a list of food coordinates instead.
+    The state is a tuple ( pacmanPosition, foodGrid ) where foodGrid is a
+    FoodMask of the remaining food. You can call foodGrid.asList() to get a list
+    of food coordinates, or foodGrid.asGrid() for a Grid (see game.py) of either
+    True or False.
 
     If you want access to info like walls, capsules, etc., you can query the
     problem.  For example, problem.walls gives you a Grid of where the walls
@@ -486,20 +629,22 @@ def foodHeuristic(state, problem):
     return max(hvalue)
 
 
+@registerAgent
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
         self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
+        walls = state.getWalls()
+        wallBits, foodBits = walls.asBitmask(), state.getFood().asBitmask()
+        x, y = state.getPacmanPosition()
+        cell = x * walls.height + y
+        while foodBits:
+            nextPathSegment, cell = closestDotPath(cell, foodBits, wallBits, walls.height)
+            if nextPathSegment == None:
+                raise Exception('No reachable food left from %s!\n%s' % (str(divmod(cell, walls.height)), str(state)))
             self.actions += nextPathSegment
-            for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % t)
-                currentState = currentState.generateSuccessor(0, action)
+            # The path is a shortest one, so the dot at its end is the only one eaten
+            foodBits &= ~(1 << cell)
         self.actionIndex = 0
         print('Path found with cost %d.' % len(self.actions))
 
@@ -512,10 +657,45 @@ class ClosestDotSearchAgent(SearchAgent):
         startPosition = gameState.getPacmanPosition()
         food = gameState.getFood()
         walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState)
 
         "*** YOUR CODE HERE ***"
-        return search.aStarSearch(problem)
+        start = startPosition[0] * walls.height + startPosition[1]
+        path, _ = closestDotPath(start, food.asBitmask(), walls.asBitmask(), walls.height)
+        if path == None: return []
+        return path
+
+def closestDotPath(start, foodBits, wallBits, height):
+    """
+    Breadth-first search from cell index start to the nearest cell whose bit is
+    set in foodBits, never entering a cell set in wallBits.  Cells are indexed
+    x * height + y as in Grid.asBitmask, so moving north or south is +/-1 and
+    east or west is +/-height.  The board must be enclosed by walls.
+
+    Returns (actions, foodCell), or (None, start) if no food is reachable.
+    """
+    if foodBits >> start & 1: return [], start
+    moves = ((1, Directions.NORTH), (-1, Directions.SOUTH),
+             (height, Directions.EAST), (-height, Directions.WEST))
+    parent = {start: None}
+    frontier = [start]
+    while frontier:
+        nextFrontier = []
+        for cell in frontier:
+            for delta, action in moves:
+                succ = cell + delta
+                if succ in parent or wallBits >> succ & 1: continue
+                parent[succ] = (cell, action)
+                if foodBits >> succ & 1:
+                    actions = []
+                    step = parent[succ]
+                    while step != None:
+                        actions.append(step[1])
+                        step = parent[step[0]]
+                    actions.reverse()
+                    return actions, succ
+                nextFrontier.append(succ)
+        frontier = nextFrontier
+    return None, start
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
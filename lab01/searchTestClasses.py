@@ -45,6 +45,22 @@ def followPath(path, problem):
     states.append(state)
   return states
 
+# Layouts and graphs are parsed once per run and shared by all the tests that
+# use the same text; searching them never modifies them.
+_parsedLayouts = {}
+_parsedGraphs = {}
+
+def parseLayout(layoutText):
+    if layoutText not in _parsedLayouts:
+        _parsedLayouts[layoutText] = layout.Layout([l.strip() for l in layoutText.split('\n')])
+    return _parsedLayouts[layoutText]
+
+def startingGameState(layoutText):
+    "Returns a new GameState for the (cached) layout."
+    gameState = pacman.GameState()
+    gameState.initialize(parseLayout(layoutText), 0)
+    return gameState
+
 def checkSolution(problem, path):
   state = problem.getStartState()
   for action in path:
@@ -54,9 +70,15 @@ def checkSolution(problem, path):
 # Search problem on a plain graph
 class GraphSearch(SearchProblem):
 
-    # Read in the state graph; define start/end states, edges and costs
+    # Read in the state graph (once per graph text); define start/end states,
+    # edges and costs
     def __init__(self, graph_text):
         self.expanded_states = []
+        if graph_text not in _parsedGraphs:
+            _parsedGraphs[graph_text] = self.parse(graph_text)
+        self.start_state, self.goals, self.successors, self.orderedSuccessorTuples = _parsedGraphs[graph_text]
+
+    def parse(self, graph_text):
         lines = graph_text.split('\n')
         r = re.match('start_state:(.*)', lines[0])
         if r == None:
@@ -94,6 +116,7 @@ class GraphSearch(SearchProblem):
         for s in all_states:
             if s not in self.successors:
                 self.successors[s] = []
+        return self.start_state, self.goals, self.successors, self.orderedSuccessorTuples
 
     # Get start state
     def getStartState(self):
@@ -175,6 +198,7 @@ class GraphSearchTest(testClasses.TestCase):
             self.heuristic = parseHeuristic(testDict['heuristic'])
         else:
             self.heuristic = None
+        GraphSearch(self.graph_text) # parse now, before any worker processes fork
 
     # Note that the return type of this function is a tripple:
     # (solution, expanded states, error message)
@@ -259,6 +283,7 @@ class PacmanSearchTest(testClasses.TestCase):
     def __init__(self, question, testDict):
         super(PacmanSearchTest, self).__init__(question, testDict)
         self.layout_text = testDict['layout']
+        parseLayout(self.layout_text)
         self.alg = testDict['algorithm']
         self.layoutName = testDict['layoutName']
 
@@ -271,9 +296,7 @@ class PacmanSearchTest(testClasses.TestCase):
 
     def getSolInfo(self, search, searchAgents):
         alg = getattr(search, self.alg)
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
-        start_state = pacman.GameState()
-        start_state.initialize(lay, 0)
+        start_state = startingGameState(self.layout_text)
 
         problemClass = getattr(searchAgents, self.searchProblemClassName)
         problemOptions = {}
@@ -385,17 +408,15 @@ class CornerProblemTest(testClasses.TestCase):
     def __init__(self, question, testDict):
         super(CornerProblemTest, self).__init__(question, testDict)
         self.layoutText = testDict['layout']
+        parseLayout(self.layoutText)
         self.layoutName = testDict['layoutName']
 
     def solution(self, search, searchAgents):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
-        gameState = pacman.GameState()
-        gameState.initialize(lay, 0)
+        gameState = startingGameState(self.layoutText)
         problem = searchAgents.CornersProblem(gameState)
         path = search.bfs(problem)
 
-        gameState = pacman.GameState()
-        gameState.initialize(lay, 0)
+        gameState = startingGameState(self.layoutText)
         visited = getStatesFromPath(gameState.getPacmanPosition(), path)
         top, right = gameState.getWalls().height-2, gameState.getWalls().width-2
         missedCorners = [p for p in ((1,1), (1,top), (right, 1), (right, top)) if p not in visited]
@@ -471,14 +492,13 @@ class HeuristicTest(testClasses.TestCase):
     def __init__(self, question, testDict):
         super(HeuristicTest, self).__init__(question, testDict)
         self.layoutText = testDict['layout']
+        parseLayout(self.layoutText)
         self.layoutName = testDict['layoutName']
         self.searchProblemClassName = testDict['searchProblemClass']
         self.heuristicName = testDict['heuristic']
 
     def setupProblem(self, searchAgents):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
-        gameState = pacman.GameState()
-        gameState.initialize(lay, 0)
+        gameState = startingGameState(self.layoutText)
         problemClass = getattr(searchAgents, self.searchProblemClassName)
         problem = problemClass(gameState)
         state = problem.getStartState()
@@ -553,6 +573,7 @@ class HeuristicGrade(testClasses.TestCase):
     def __init__(self, question, testDict):
         super(HeuristicGrade, self).__init__(question, testDict)
         self.layoutText = testDict['layout']
+        parseLayout(self.layoutText)
         self.layoutName = testDict['layoutName']
         self.searchProblemClassName = testDict['searchProblemClass']
         self.heuristicName = testDict['heuristic']
@@ -560,9 +581,7 @@ class HeuristicGrade(testClasses.TestCase):
         self.thresholds = [int(t) for t in testDict['gradingThresholds'].split()]
 
     def setupProblem(self, searchAgents):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
-        gameState = pacman.GameState()
-        gameState.initialize(lay, 0)
+        gameState = startingGameState(self.layoutText)
         problemClass = getattr(searchAgents, self.searchProblemClassName)
         problem = problemClass(gameState)
         state = problem.getStartState()
@@ -631,12 +650,11 @@ class ClosestDotTest(testClasses.TestCase):
     def __init__(self, question, testDict):
         super(ClosestDotTest, self).__init__(question, testDict)
         self.layoutText = testDict['layout']
+        parseLayout(self.layoutText)
         self.layoutName = testDict['layoutName']
 
     def solution(self, searchAgents):
-        lay = layout.Layout([l.strip() for l in self.layoutText.split('\n')])
-        gameState = pacman.GameState()
-        gameState.initialize(lay, 0)
+        gameState = startingGameState(self.layoutText)
         path = searchAgents.ClosestDotSearchAgent().findPathToClosestDot(gameState)
         return path
 
@@ -689,13 +707,12 @@ class CornerHeuristicSanity(testClasses.TestCase):
     def __init__(self, question, testDict):
         super(CornerHeuristicSanity, self).__init__(question, testDict)
         self.layout_text = testDict['layout']
+        parseLayout(self.layout_text)
 
     def execute(self, grades, moduleDict, solutionDict):
         search = moduleDict['search']
         searchAgents = moduleDict['searchAgents']
-        game_state = pacman.GameState()
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
-        game_state.initialize(lay, 0)
+        game_state = startingGameState(self.layout_text)
         problem = searchAgents.CornersProblem(game_state)
         start_state = problem.getStartState()
         h0 = searchAgents.cornersHeuristic(start_state, problem)
@@ -749,9 +766,7 @@ class CornerHeuristicSanity(testClasses.TestCase):
         handle.write('# true cost of the optimal path from that state to a goal.\n')
 
         # solve problem and write solution
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
-        start_state = pacman.GameState()
-        start_state.initialize(lay, 0)
+        start_state = startingGameState(self.layout_text)
         problem = searchAgents.CornersProblem(start_state)
         solution = search.astar(problem, searchAgents.cornersHeuristic)
         handle.write('cost: "%d"\n' % len(solution))
@@ -766,6 +781,7 @@ class CornerHeuristicPacman(testClasses.TestCase):
     def __init__(self, question, testDict):
         super(CornerHeuristicPacman, self).__init__(question, testDict)
         self.layout_text = testDict['layout']
+        parseLayout(self.layout_text)
 
     def execute(self, grades, moduleDict, solutionDict):
         search = moduleDict['search']
@@ -773,9 +789,7 @@ class CornerHeuristicPacman(testClasses.TestCase):
         total = 0
         true_cost = float(solutionDict['cost'])
         thresholds = [int(x) for x in solutionDict['thresholds'].split()]
-        game_state = pacman.GameState()
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
-        game_state.initialize(lay, 0)
+        game_state = startingGameState(self.layout_text)
         problem = searchAgents.CornersProblem(game_state)
         start_state = problem.getStartState()
         if searchAgents.cornersHeuristic(start_state, problem) > true_cost:
@@ -810,9 +824,7 @@ class CornerHeuristicPacman(testClasses.TestCase):
         handle.write('# used in scoring.\n')
 
         # solve problem and write solution
-        lay = layout.Layout([l.strip() for l in self.layout_text.split('\n')])
-        start_state = pacman.GameState()
-        start_state.initialize(lay, 0)
+        start_state = startingGameState(self.layout_text)
         problem = searchAgents.CornersProblem(start_state)
         solution = search.astar(problem, searchAgents.cornersHeuristic)
         handle.write('cost: "%d"\n' % len(solution))
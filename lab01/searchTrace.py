@@ -0,0 +1,188 @@
+# searchTrace.py
+# --------------
+# Opt-in instrumentation for the search problems in search.py and
+# searchAgents.py.
+
+
+"""
+Records how a search algorithm explores a SearchProblem, without changing the
+algorithms in search.py.  Wrap the problem (and heuristic) before searching:
+
+    trace = SearchTrace()
+    problem = TracedSearchProblem(FoodSearchProblem(gameState), trace)
+    actions = search.aStarSearch(problem, trace.wrapHeuristic(foodHeuristic))
+    trace.writeJSON('trace.json')
+
+or let traceSearch do the wrapping.  The trace counts expansions, generated
+successors, duplicate hits (successors whose state was already discovered),
+goal tests and heuristic calls, keeps the time spent in getSuccessors and in
+the heuristic separately, and samples the frontier size, taken as the number
+of states discovered but not yet expanded.
+
+From the command line, for example:
+
+> python searchTrace.py -l trickySearch -p FoodSearchProblem -H foodHeuristic -o trace.json
+
+SearchAgent also accepts a trace file: -a fn=astar,heuristic=manhattanHeuristic,trace=trace.json
+"""
+
+import json
+import time
+import search
+
+class SearchTrace:
+    """
+    Counters and timings for one search.  sampleEvery controls how often (in
+    expansions) the frontier size is recorded.
+    """
+
+    def __init__(self, sampleEvery=1):
+        self.sampleEvery = sampleEvery
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.goalTests = 0
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0
+        self.successorTime = 0.0
+        self.searchTime = 0.0
+        self.frontier = [] # (expansions, frontier size) samples
+        self.maxFrontier = 0
+        self._discovered = set()
+        self._closed = set()
+
+    def discover(self, state):
+        if state in self._discovered:
+            self.duplicates += 1
+        else:
+            self._discovered.add(state)
+
+    def close(self, state):
+        self.expanded += 1
+        self._closed.add(state)
+        size = len(self._discovered) - len(self._closed)
+        if size > self.maxFrontier: self.maxFrontier = size
+        if self.expanded % self.sampleEvery == 0:
+            self.frontier.append((self.expanded, size))
+
+    def wrapHeuristic(self, heuristic):
+        "Returns heuristic with its calls counted and timed by this trace."
+        def tracedHeuristic(state, problem=None):
+            start = time.perf_counter()
+            value = heuristic(state, problem)
+            self.heuristicTime += time.perf_counter() - start
+            self.heuristicCalls += 1
+            return value
+        return tracedHeuristic
+
+    def asDict(self):
+        return {
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates': self.duplicates,
+            'uniqueStates': len(self._discovered),
+            'goalTests': self.goalTests,
+            'maxFrontier': self.maxFrontier,
+            'frontier': self.frontier,
+            'heuristicCalls': self.heuristicCalls,
+            'heuristicTime': self.heuristicTime,
+            'successorTime': self.successorTime,
+            'searchTime': self.searchTime,
+        }
+
+    def writeJSON(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.asDict(), f)
+
+    def __str__(self):
+        return ('Expanded %d, generated %d (%d duplicates), max frontier %d\n'
+                'Heuristic: %d calls in %.3f seconds; successors: %.3f seconds; total: %.3f seconds' %
+                (self.expanded, self.generated, self.duplicates, self.maxFrontier,
+                 self.heuristicCalls, self.heuristicTime, self.successorTime, self.searchTime))
+
+class TracedSearchProblem(search.SearchProblem):
+    """
+    Forwards every call to problem while recording it in trace.  Any other
+    attribute (walls, heuristicInfo, _expanded, ...) is read from the wrapped
+    problem, so heuristics see the problem they were written for.
+    """
+
+    def __init__(self, problem, trace):
+        self.problem = problem
+        self.trace = trace
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def getStartState(self):
+        state = self.problem.getStartState()
+        self.trace.discover(state)
+        return state
+
+    def isGoalState(self, state):
+        self.trace.goalTests += 1
+        return self.problem.isGoalState(state)
+
+    def getSuccessors(self, state):
+        start = time.perf_counter()
+        successors = self.problem.getSuccessors(state)
+        self.trace.successorTime += time.perf_counter() - start
+        self.trace.generated += len(successors)
+        for successor in successors:
+            self.trace.discover(successor[0])
+        self.trace.close(state)
+        return successors
+
+    def getCostOfActions(self, actions):
+        return self.problem.getCostOfActions(actions)
+
+def traceSearch(searchFunction, problem, heuristic=None, sampleEvery=1):
+    """
+    Runs searchFunction on a traced copy of problem and returns the actions it
+    found together with the SearchTrace.
+    """
+    trace = SearchTrace(sampleEvery)
+    traced = TracedSearchProblem(problem, trace)
+    start = time.perf_counter()
+    if heuristic == None:
+        actions = searchFunction(traced)
+    else:
+        actions = searchFunction(traced, heuristic=trace.wrapHeuristic(heuristic))
+    trace.searchTime = time.perf_counter() - start
+    return actions, trace
+
+if __name__ == '__main__':
+    import optparse
+    import layout
+    import pacman
+    import searchAgents
+
+    parser = optparse.OptionParser(description = 'Trace a search on a Pacman layout')
+    parser.add_option('-l', '--layout', dest = 'layout', default = 'mediumMaze',
+                      help = 'the layout to search')
+    parser.add_option('-p', '--problem', dest = 'problem', default = 'PositionSearchProblem',
+                      help = 'the search problem class in searchAgents.py')
+    parser.add_option('-f', '--fn', dest = 'fn', default = 'aStarSearch',
+                      help = 'the search function in search.py')
+    parser.add_option('-H', '--heuristic', dest = 'heuristic', default = None,
+                      help = 'a heuristic in searchAgents.py or search.py')
+    parser.add_option('-s', '--sample-every', dest = 'sampleEvery', type = 'int', default = 1,
+                      help = 'expansions between frontier size samples')
+    parser.add_option('-o', '--output', dest = 'output', default = None,
+                      help = 'write the trace as JSON to this file')
+    options, _ = parser.parse_args()
+
+    gameState = pacman.GameState()
+    gameState.initialize(layout.getLayout(options.layout), 0)
+    problem = getattr(searchAgents, options.problem)(gameState)
+    heuristic = None
+    if options.heuristic != None:
+        if options.heuristic in dir(searchAgents):
+            heuristic = getattr(searchAgents, options.heuristic)
+        else:
+            heuristic = getattr(search, options.heuristic)
+    actions, trace = traceSearch(getattr(search, options.fn), problem, heuristic, options.sampleEvery)
+    print('Path found with total cost of %d' % problem.getCostOfActions(actions))
+    print(trace)
+    if options.output != None:
+        trace.writeJSON(options.output)
@@ -0,0 +1,291 @@
+# slidingPuzzle.py
+# ----------------
+# The eight puzzle of eightpuzzle.py generalized to any width x width board,
+# such as the 15- and 24-puzzles.
+
+
+"""
+SlidingPuzzleState has the isGoal, legalMoves, result and asList methods of
+EightPuzzleState, so the search problem is the same; SlidingPuzzleSearchProblem
+only adds the board width.  The goal has the blank in the top-left corner and
+tile t in cell t (row-major), as in eightpuzzle.py.
+
+States are packed into a single integer, (width*width - 1).bit_length() bits
+per tile, with the blank moves of each cell precomputed per board size by
+eightpuzzle.blankMoves.  For width 3 this is the packing of
+eightpuzzle.PackedEightPuzzleState, and its tables are shared.
+
+manhattanLinearConflictHeuristic adds, to the Manhattan distance, two moves for
+each tile that has to leave its goal row or column to let another tile in the
+same line pass.  A state made by result() from a state whose value is known
+computes its own value from the parent's, looking only at the two lines the
+moved tile leaves and enters.
+
+Run this file to compare aStarSearch with iterativeDeepeningAStarSearch:
+
+> python slidingPuzzle.py -w 4 -n 5 -m 60
+"""
+
+import random
+import search
+import eightpuzzle
+from eightpuzzle import EightPuzzleSearchProblem
+
+class SlidingBoard:
+    "Precomputed tables shared by all SlidingPuzzleStates of one width."
+
+    def __init__(self, width):
+        self.width = width
+        self.cells = width * width
+        self.bits = max(1, (self.cells - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.goal = sum([tile << (self.bits * tile) for tile in range(self.cells)])
+        if width == 3:
+            self.blankMoves = eightpuzzle.BLANK_MOVES
+            self.legalMoves = eightpuzzle.LEGAL_MOVES
+            self.moveTargets = eightpuzzle.MOVE_TARGETS
+        else:
+            self.blankMoves = eightpuzzle.blankMoves(width) # per blank cell, (move, cell the blank moves to)
+            self.legalMoves = [[move for move, _ in moves] for moves in self.blankMoves]
+            self.moveTargets = [dict(moves) for moves in self.blankMoves]
+
+_boards = {}
+
+def getBoard(width):
+    if width not in _boards: _boards[width] = SlidingBoard(width)
+    return _boards[width]
+
+def neighbours(width):
+    """
+    Returns, for each cell of a width x width board, the cells next to it in
+    the order up, down, left, right.
+    """
+    return [[target for _, target in moves] for moves in getBoard(width).blankMoves]
+
+def isSolvable(tiles, width):
+    """
+    Returns whether the goal can be reached from tiles.  Counting inversions
+    among the non-blank tiles, a vertical move changes their number by
+    width - 1, so the parity of inversions (plus the blank's row when width
+    is even) is invariant, and it is even at the goal.
+
+    >>> isSolvable([1, 0, 2, 3, 4, 5, 6, 7, 8], 3)
+    True
+    >>> isSolvable([0, 2, 1, 3, 4, 5, 6, 7, 8], 3)
+    False
+    """
+    numbers = [t for t in tiles if t != 0]
+    inversions = 0
+    for i in range(len(numbers)):
+        for j in range(i + 1, len(numbers)):
+            if numbers[i] > numbers[j]: inversions += 1
+    if width % 2 == 0:
+        inversions += list(tiles).index(0) // width
+    return inversions % 2 == 0
+
+def randomSolvableTiles(width, rand=random):
+    "Returns a uniformly random solvable width x width puzzle as a tile list."
+    tiles = list(range(width * width))
+    while True:
+        rand.shuffle(tiles)
+        if isSolvable(tiles, width): return tiles
+
+class SlidingPuzzleState:
+    """
+    A width x width sliding puzzle.  numbers lists the tiles in row-major
+    order with 0 for the blank; width defaults to the square root of their
+    number.
+
+    >>> SlidingPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left').isGoal()
+    True
+    """
+    __slots__ = ('board', 'packed', 'blank', 'h')
+
+    def __init__( self, numbers, width=None ):
+        if width == None: width = int(round(len(numbers) ** 0.5))
+        if sorted(numbers) != list(range(width * width)):
+            raise Exception('A %dx%d puzzle needs the numbers 0..%d' % (width, width, width * width - 1))
+        self.board = getBoard(width)
+        self.packed = 0
+        for cell, tile in enumerate(numbers):
+            self.packed |= tile << (self.board.bits * cell)
+        self.blank = list(numbers).index(0)
+        self.h = None # manhattanLinearConflictHeuristic value, once known
+
+    def isGoal( self ):
+        return self.packed == self.board.goal
+
+    def isSolvable( self ):
+        return isSolvable(self.asList(), self.board.width)
+
+    def legalMoves( self ):
+        "Returns the legal moves; the list is shared and must not be modified."
+        return self.board.legalMoves[self.blank]
+
+    def result(self, move):
+        """
+          Returns a new state with the move applied, carrying the parent's
+        heuristic value forward if it is known.
+        """
+        board = self.board
+        target = board.moveTargets[self.blank][move]
+        shift = board.bits * target
+        tile = (self.packed >> shift) & board.mask
+        newPuzzle = SlidingPuzzleState.__new__(SlidingPuzzleState)
+        newPuzzle.board = board
+        newPuzzle.packed = self.packed - (tile << shift) + (tile << (board.bits * self.blank))
+        newPuzzle.blank = target
+        if self.h == None:
+            newPuzzle.h = None
+        else:
+            newPuzzle.h = self.h + _heuristicChange(self, newPuzzle, tile, target, self.blank)
+        return newPuzzle
+
+    def tile(self, cell):
+        return (self.packed >> (self.board.bits * cell)) & self.board.mask
+
+    def asList(self):
+        return [self.tile(cell) for cell in range(self.board.cells)]
+
+    def __eq__(self, other):
+        if not isinstance(other, SlidingPuzzleState): return False
+        return self.packed == other.packed and self.board.width == other.board.width
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def __str__(self):
+        width = self.board.width
+        size = len(str(self.board.cells - 1))
+        horizontalLine = '-' * ((size + 3) * width + 1)
+        lines = [horizontalLine]
+        for row in range(width):
+            rowLine = '|'
+            for col in range(width):
+                tile = self.tile(row * width + col)
+                if tile == 0:
+                    tile = ''
+                rowLine = rowLine + ' ' + str(tile).rjust(size) + ' |'
+            lines.append(rowLine)
+            lines.append(horizontalLine)
+        return '\n'.join(lines)
+
+class SlidingPuzzleSearchProblem(EightPuzzleSearchProblem):
+    """
+      The EightPuzzleSearchProblem for a SlidingPuzzleState of any width.
+    """
+    def __init__(self, puzzle):
+        EightPuzzleSearchProblem.__init__(self, puzzle)
+        self.width = puzzle.board.width
+
+def _lineConflicts(goalOrder):
+    """
+    goalOrder lists, in board order, the goal positions along a line of the
+    tiles that belong to that line.  Tiles outside the longest increasing
+    subsequence must leave the line and come back: two moves each.
+    """
+    tails = []
+    for value in goalOrder:
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if tails[middle] < value: low = middle + 1
+            else: high = middle
+        if low == len(tails): tails.append(value)
+        else: tails[low] = value
+    return 2 * (len(goalOrder) - len(tails))
+
+def _rowConflicts(state, row):
+    width = state.board.width
+    order = []
+    for col in range(width):
+        tile = state.tile(row * width + col)
+        if tile != 0 and tile // width == row: order.append(tile % width)
+    return _lineConflicts(order)
+
+def _columnConflicts(state, col):
+    width = state.board.width
+    order = []
+    for row in range(width):
+        tile = state.tile(row * width + col)
+        if tile != 0 and tile % width == col: order.append(tile // width)
+    return _lineConflicts(order)
+
+def _heuristicChange(parent, child, tile, source, destination):
+    "The change in heuristic value when tile slides from source to destination."
+    width = parent.board.width
+    goalRow, goalCol = divmod(tile, width)
+    sourceRow, sourceCol = divmod(source, width)
+    destinationRow, destinationCol = divmod(destination, width)
+    change = abs(destinationRow - goalRow) + abs(destinationCol - goalCol) \
+           - abs(sourceRow - goalRow) - abs(sourceCol - goalCol)
+    # A tile sliding within a column keeps its order in the column, and
+    # likewise for rows, so only the two lines it crosses between can change.
+    if sourceCol == destinationCol:
+        for row in (sourceRow, destinationRow):
+            change += _rowConflicts(child, row) - _rowConflicts(parent, row)
+    else:
+        for col in (sourceCol, destinationCol):
+            change += _columnConflicts(child, col) - _columnConflicts(parent, col)
+    return change
+
+def manhattanLinearConflictHeuristic(state, problem=None):
+    """
+    Manhattan distance plus linear conflicts, an admissible heuristic for a
+    SlidingPuzzleState.  The value is stored on the state and passed on to
+    the states result() makes from it.
+    """
+    if state.h != None: return state.h
+    width = state.board.width
+    h = 0
+    for cell in range(state.board.cells):
+        tile = state.tile(cell)
+        if tile != 0:
+            h += abs(cell // width - tile // width) + abs(cell % width - tile % width)
+    for line in range(width):
+        h += _rowConflicts(state, line) + _columnConflicts(state, line)
+    state.h = h
+    return h
+
+def createRandomSlidingPuzzle(width, moves=None, rand=random):
+    """
+    A random solvable width x width puzzle: uniformly random if moves is None,
+    otherwise made by that many random moves from the goal.
+    """
+    if moves == None:
+        return SlidingPuzzleState(randomSolvableTiles(width, rand), width)
+    puzzle = SlidingPuzzleState(list(range(width * width)), width)
+    for i in range(moves):
+        puzzle = puzzle.result(rand.choice(puzzle.legalMoves()))
+    return puzzle
+
+if __name__ == '__main__':
+    import optparse
+    import searchTrace
+
+    parser = optparse.OptionParser(description = 'Benchmark A* and IDA* on random sliding puzzles')
+    parser.add_option('-w', '--width', dest = 'width', type = 'int', default = 4,
+                      help = 'board width: 3 for the eight puzzle, 4 for the 15-puzzle, ...')
+    parser.add_option('-n', '--puzzles', dest = 'puzzles', type = 'int', default = 5,
+                      help = 'number of random puzzles')
+    parser.add_option('-m', '--moves', dest = 'moves', type = 'int', default = 60,
+                      help = 'random moves from the goal; 0 for uniformly random puzzles')
+    parser.add_option('-s', '--seed', dest = 'seed', type = 'int', default = 0,
+                      help = 'random seed')
+    options, _ = parser.parse_args()
+
+    rand = random.Random(options.seed)
+    moves = options.moves
+    if moves == 0: moves = None
+    puzzles = [createRandomSlidingPuzzle(options.width, moves, rand) for i in range(options.puzzles)]
+    for name, searchFunction in [('astar', search.aStarSearch), ('idastar', search.iterativeDeepeningAStarSearch)]:
+        expanded, elapsed, length = 0, 0.0, 0
+        for puzzle in puzzles:
+            puzzle.h = None
+            problem = SlidingPuzzleSearchProblem(puzzle)
+            actions, trace = searchTrace.traceSearch(searchFunction, problem, manhattanLinearConflictHeuristic)
+            expanded += trace.expanded
+            elapsed += trace.searchTime
+            length += len(actions)
+        print('%-8s mean solution %5.1f moves, %9.1f nodes expanded, %.4f seconds per puzzle' %
+              (name, float(length) / len(puzzles), float(expanded) / len(puzzles), elapsed / len(puzzles)))
@@ -0,0 +1,104 @@
+# startupBenchmark.py
+# -------------------
+# Measures how long pacman.py and autograder.py take to start.
+
+
+"""
+Runs pacman.py in fresh interpreters and reports the time from launching the
+process to Pacman's first move, which covers interpreter startup, imports,
+loading the layout and agents, and registerInitialState (for SearchAgent, the
+whole search).  It then reruns the same command under python -X importtime and
+lists the slowest top-level imports.
+
+> python startupBenchmark.py -l tinyMaze -p SearchAgent -n 5
+> python startupBenchmark.py --autograder q1
+
+Options after -- are passed on to pacman.py; -q is always added, so no display
+is opened.
+"""
+
+import optparse
+import os
+import subprocess
+import sys
+import time
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+# Runs pacman.py and prints the time of the first getAction call to stderr
+FIRST_MOVE = """
+import sys, time
+import pacman
+args = pacman.readCommand(sys.argv[1:])
+agent = args['pacman']
+getAction = agent.getAction
+def firstMove(state):
+    sys.stderr.write('FIRST_MOVE %r\\n' % time.time())
+    sys.stderr.flush()
+    agent.getAction = getAction
+    return getAction(state)
+agent.getAction = firstMove
+pacman.runGames(**args)
+"""
+
+def timeToFirstMove(pacmanArgs):
+    "Seconds from launching pacman.py with pacmanArgs to Pacman's first move"
+    start = time.time()
+    process = subprocess.Popen([sys.executable, '-c', FIRST_MOVE] + pacmanArgs, cwd=DIRECTORY,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                               universal_newlines=True)
+    _, errors = process.communicate()
+    for line in errors.split('\n'):
+        if line.startswith('FIRST_MOVE '):
+            return float(line.split()[1]) - start
+    raise Exception('pacman.py made no move:\n%s' % errors)
+
+def importTimes(command):
+    """
+    Runs command (arguments for python) under -X importtime and returns the
+    top-level imports as (cumulative seconds, module), slowest first.
+    """
+    process = subprocess.Popen([sys.executable, '-X', 'importtime'] + command, cwd=DIRECTORY,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                               universal_newlines=True)
+    _, errors = process.communicate()
+    times = []
+    for line in errors.split('\n'):
+        if not line.startswith('import time:'): continue
+        fields = line[len('import time:'):].split('|')
+        # nested imports are indented under the module that imports them
+        if len(fields) != 3 or fields[2].startswith('  ') or not fields[1].strip().isdigit(): continue
+        times.append((int(fields[1]) / 1e6, fields[2].strip()))
+    return sorted(times, reverse=True)
+
+def printImportTimes(command, top):
+    times = importTimes(command)
+    print('Imports of python %s: %.3f seconds' % (' '.join(command), sum([t for t, _ in times])))
+    for seconds, module in times[:top]:
+        print('  %8.4f  %s' % (seconds, module))
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(usage = 'python startupBenchmark.py [options] [-- pacman options]',
+                                   description = 'Time pacman.py startup and its first move')
+    parser.add_option('-l', '--layout', dest = 'layout', default = 'tinyMaze',
+                      help = 'the layout to play')
+    parser.add_option('-p', '--pacman', dest = 'pacman', default = 'SearchAgent',
+                      help = 'the Pacman agent')
+    parser.add_option('-n', '--runs', dest = 'runs', type = 'int', default = 5,
+                      help = 'number of fresh interpreters to time')
+    parser.add_option('-t', '--top', dest = 'top', type = 'int', default = 10,
+                      help = 'number of slowest imports to list')
+    parser.add_option('--autograder', dest = 'question', default = None,
+                      help = 'also profile the imports of autograder.py grading this question')
+    options, extra = parser.parse_args()
+
+    pacmanArgs = ['-q', '-l', options.layout, '-p', options.pacman] + extra
+    times = sorted([timeToFirstMove(pacmanArgs) for i in range(options.runs)])
+    print('Time to first move of pacman.py %s' % ' '.join(pacmanArgs))
+    print('  median %.3f seconds, best %.3f, worst %.3f over %d runs' %
+          (times[len(times) // 2], times[0], times[-1], len(times)))
+    print('')
+    printImportTimes(['pacman.py'] + pacmanArgs, options.top)
+    if options.question != None:
+        print('')
+        printImportTimes(['autograder.py', '--no-graphics', '--mute', '-q', options.question], options.top)
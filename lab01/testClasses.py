@@ -14,8 +14,15 @@
 
 # import modules from python standard library
 import inspect
+import io
+import multiprocessing
+import pickle
 import re
 import sys
+import traceback
+
+import grading
+import util
 
 
 # Class which models a question in a project.  Note that questions have a
@@ -141,6 +148,88 @@ class NumberPassedQuestion(Question):
 
 
 
+# Running the test cases of a question in worker processes.  The workers are
+# forked, so they inherit the loaded student modules and the test thunks, and
+# nothing but the recorded results has to be pickled.
+_pendingThunks = []
+
+def _runPendingThunk(index, mute):
+    out = io.StringIO()
+    recorder = grading.GradesRecorder(out, mute)
+    if mute:
+        sys.stdout = util.WritableNull()
+        util._ORIGINAL_STDOUT = out
+    else:
+        sys.stdout = out
+    error = None
+    try:
+        result = _pendingThunks[index](recorder)
+    except Exception as inst:
+        result = None
+        error = _picklableError(inst) + (traceback.format_exc(),)
+    return result, out.getvalue(), recorder.calls, error
+
+def _picklableError(inst):
+    """
+    The class and arguments of inst, or whatever of them can be sent back from
+    a worker: Exception in place of the class, str(inst) in place of the args.
+    """
+    errorType, args = type(inst), inst.args
+    try:
+        pickle.dumps(errorType)
+    except Exception:
+        errorType = Exception
+    try:
+        pickle.dumps(args)
+    except Exception:
+        args = (str(inst),)
+    return errorType, args
+
+def _replayThunk(outcome):
+    result, output, calls, error = outcome
+    def replay(grades):
+        if grades.mute: util.unmutePrint()
+        sys.stdout.write(output)
+        if grades.mute: util.mutePrint()
+        grades.replay(calls)
+        if error != None:
+            # Raise the worker's exception again, with its class, so the
+            # error hints of autograder.ERROR_HINT_MAP match a serial run.
+            # __init__ is skipped, as a subclass may take other arguments.
+            errorType, args, formatted = error
+            inst = errorType.__new__(errorType)
+            inst.args = args
+            inst.workerTraceback = formatted
+            raise inst
+        return result
+    return replay
+
+def runTestCasesInParallel(question, grades, jobs):
+    """
+    Runs the test cases of question in up to jobs worker processes, then swaps
+    each test's thunk for one that prints the worker's output and replays its
+    grade changes.  question.execute then sees the same results, messages and
+    output, in the same order, as in a serial run.  Tests run serially, when
+    execute calls them, if jobs is 1, processes cannot be forked, or the
+    question itself is being graded in a worker (see Grades.startWorkers).
+    """
+    global _pendingThunks
+    if jobs <= 1 or len(question.testCases) < 2: return
+    # Questions graded in worker processes already run in parallel
+    if multiprocessing.current_process().daemon: return
+    if 'fork' not in multiprocessing.get_all_start_methods(): return
+    _pendingThunks = [thunk for _, thunk in question.testCases]
+    pool = multiprocessing.get_context('fork').Pool(min(jobs, len(_pendingThunks)))
+    try:
+        outcomes = pool.starmap(_runPendingThunk, [(i, grades.mute) for i in range(len(_pendingThunks))])
+    finally:
+        pool.terminate()
+        pool.join()
+        _pendingThunks = []
+    question.testCases = [(testCase, _replayThunk(outcome))
+                          for (testCase, _), outcome in zip(question.testCases, outcomes)]
+
+
 # Template modeling a generic test case
 class TestCase(object):
 
@@ -22,10 +22,6 @@ import sys
 import projectParams
 import random
 random.seed(0)
-try: 
-    from pacman import GameState
-except:
-    pass
 
 # register arguments and set default values
 def readCommand(argv):
@@ -75,6 +71,28 @@ def readCommand(argv):
                     dest = 'noGraphics',
                     action = 'store_true',
                     help = 'No graphics display for pacman games.')
+    parser.add_option('--no-test-cache',
+                    dest = 'noTestCache',
+                    action = 'store_true',
+                    help = 'Parse test files again instead of reusing parses cached by earlier runs.')
+    parser.add_option('--timing-report',
+                    dest = 'timingReport',
+                    default = None,
+                    help = 'Write the wall and CPU time and peak memory of every test case to this JSON file.')
+    parser.add_option('--timing-baseline',
+                    dest = 'timingBaseline',
+                    default = None,
+                    help = 'Fail if a test case runs slower than in this timing report.')
+    parser.add_option('--timing-threshold',
+                    dest = 'timingThreshold',
+                    type = 'float',
+                    default = 0.25,
+                    help = 'Fraction by which a test case may exceed its baseline time. Default: %default')
+    parser.add_option('--jobs', '-j',
+                    dest = 'jobs',
+                    type = 'int',
+                    default = 1,
+                    help = 'Grade questions, or the test cases of a single question, in this many worker processes.')
     (options, args) = parser.parse_args(argv)
     return options
 
@@ -132,6 +150,41 @@ def loadModuleFile(moduleName, filePath):
     with open(filePath, 'r') as f:
         return imp.load_module(moduleName, f, "%s.py" % moduleName, (".py", "r", imp.PY_SOURCE))
 
+class LazyModuleDict:
+    """
+    The student modules by name, each loaded from its file on first use, so
+    that grading one question does not import the code of the others.  A
+    module already imported from the same file, say by the test classes, is
+    used as it is rather than loaded a second time.
+    """
+    def __init__(self):
+        self.paths = {}
+        self.modules = {}
+
+    def addModule(self, moduleName, filePath, module=None):
+        "Adds the module at filePath; a module given is taken as already loaded"
+        self.paths[moduleName] = filePath
+        if module != None: self.modules[moduleName] = module
+
+    def __getitem__(self, moduleName):
+        if moduleName not in self.modules:
+            filePath = self.paths[moduleName]
+            module = sys.modules.get(moduleName)
+            source = getattr(module, '__file__', None)
+            if source == None or os.path.splitext(os.path.abspath(source))[0] != os.path.splitext(os.path.abspath(filePath))[0]:
+                module = loadModuleFile(moduleName, filePath)
+            self.modules[moduleName] = module
+        return self.modules[moduleName]
+
+    def __contains__(self, moduleName):
+        return moduleName in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def keys(self):
+        return list(self.paths)
+
 
 def readFile(path, root=""):
     "Read file from disk at specified path and return as string"
@@ -194,8 +247,7 @@ def printTest(testDict, solutionDict):
 def runTest(testName, moduleDict, printTestCase=False, display=None):
     import testParser
     import testClasses
-    for module in moduleDict:
-        setattr(sys.modules[__name__], module, moduleDict[module])
+    setattr(sys.modules[__name__], 'projectTestClasses', moduleDict['projectTestClasses'])
 
     testDict = testParser.TestParser(testName + ".test").parse()
     solutionDict = testParser.TestParser(testName + ".solution").parse()
@@ -241,13 +293,13 @@ def getTestSubdirs(testParser, testRoot, questionToGrade):
 
 # evaluate student code
 def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MAP, edxOutput=False, muteOutput=False,
-            printTestCase=False, questionToGrade=None, display=None):
-    # imports of testbench code.  note that the testClasses import must follow
-    # the import of student code due to dependencies
+            printTestCase=False, questionToGrade=None, display=None, jobs=1,
+            timingReport=None, timingBaseline=None, timingThreshold=0.25):
+    # imports of testbench code.  student modules are loaded from moduleDict
+    # on first use, and reused if the test classes have imported them
     import testParser
     import testClasses
-    for module in moduleDict:
-        setattr(sys.modules[__name__], module, moduleDict[module])
+    setattr(sys.modules[__name__], 'projectTestClasses', moduleDict['projectTestClasses'])
 
     questions = []
     questionDicts = {}
@@ -264,9 +316,7 @@ def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MA
         questionDicts[q] = questionDict
 
         # load test cases into question
-        tests = filter(lambda t: re.match('[^#~.].*\.test\Z', t), os.listdir(subdir_path))
-        tests = map(lambda t: re.match('(.*)\.test\Z', t).group(1), tests)
-        for t in sorted(tests):
+        for t in testParser.listTests(subdir_path):
             test_file = os.path.join(subdir_path, '%s.test' % t)
             solution_file = os.path.join(subdir_path, '%s.solution' % t)
             test_out_file = os.path.join(subdir_path, '%s.test_output' % t)
@@ -285,24 +335,40 @@ def evaluate(generateSolutions, testRoot, moduleDict, exceptionMap=ERROR_HINT_MA
                     testDict = testParser.TestParser(test_file).parse()
                     solutionDict = testParser.TestParser(solution_file).parse()
                     if printTestCase:
-                        return lambda grades: printTest(testDict, solutionDict) or testCase.execute(grades, moduleDict, solutionDict)
+                        run = lambda grades: printTest(testDict, solutionDict) or testCase.execute(grades, moduleDict, solutionDict)
                     else:
-                        return lambda grades: testCase.execute(grades, moduleDict, solutionDict)
+                        run = lambda grades: testCase.execute(grades, moduleDict, solutionDict)
+                    name = '%s/%s' % (q, t)
+                    return lambda grades: grades.timeTest(name, lambda: run(grades))
             question.addTestCase(testCase, makefun(testCase, solution_file))
 
         # Note extra function is necessary for scoping reasons
         def makefun(question):
-            return lambda grades: question.execute(grades)
+            def run(grades):
+                if not generateSolutions:
+                    testClasses.runTestCasesInParallel(question, grades, jobs)
+                return question.execute(grades)
+            return run
         setattr(sys.modules[__name__], q, makefun(question))
         questions.append((q, question.getMaxPoints()))
 
-    grades = grading.Grades(projectParams.PROJECT_NAME, questions, edxOutput=edxOutput, muteOutput=muteOutput)
+    grades = grading.Grades(projectParams.PROJECT_NAME, questions, edxOutput=edxOutput, muteOutput=muteOutput, jobs=jobs)
     if questionToGrade == None:
         for q in questionDicts:
             for prereq in questionDicts[q].get('depends', '').split():
                 grades.addPrereq(q, prereq)
 
     grades.grade(sys.modules[__name__], bonusPic = projectParams.BONUS_PIC)
+    if timingReport != None:
+        grades.writeTimingReport(timingReport)
+    if timingBaseline != None:
+        regressions = grading.timingRegressions(grading.loadTimingReport(timingBaseline),
+                                                grades.timingReport(), timingThreshold)
+        for test, before, after in regressions:
+            print 'Timing regression: %s took %.2fs, %.2fs in the baseline' % (test, after, before)
+        if regressions:
+            sys.exit('%d test case(s) ran more than %d%% slower than in %s' %
+                     (len(regressions), round(100 * timingThreshold), timingBaseline))
     return grades.points
 
 
@@ -327,6 +393,9 @@ if __name__ == '__main__':
     options = readCommand(sys.argv)
     if options.generateSolutions:
         confirmGenerate()
+    if options.noTestCache:
+        import testParser
+        testParser.useCache = False
     codePaths = options.studentCode.split(',')
     # moduleCodeDict = {}
     # for cp in codePaths:
@@ -335,12 +404,13 @@ if __name__ == '__main__':
     # moduleCodeDict['projectTestClasses'] = readFile(options.testCaseCode, root=options.codeRoot)
     # moduleDict = loadModuleDict(moduleCodeDict)
 
-    moduleDict = {}
+    moduleDict = LazyModuleDict()
     for cp in codePaths:
         moduleName = re.match('.*?([^/]*)\.py', cp).group(1)
-        moduleDict[moduleName] = loadModuleFile(moduleName, os.path.join(options.codeRoot, cp))
+        moduleDict.addModule(moduleName, os.path.join(options.codeRoot, cp))
     moduleName = re.match('.*?([^/]*)\.py', options.testCaseCode).group(1)
-    moduleDict['projectTestClasses'] = loadModuleFile(moduleName, os.path.join(options.codeRoot, options.testCaseCode))
+    testCasePath = os.path.join(options.codeRoot, options.testCaseCode)
+    moduleDict.addModule('projectTestClasses', testCasePath, loadModuleFile(moduleName, testCasePath))
 
 
     if options.runTest != None:
@@ -348,4 +418,6 @@ if __name__ == '__main__':
     else:
         evaluate(options.generateSolutions, options.testRoot, moduleDict,
             edxOutput=options.edxOutput, muteOutput=options.muteOutput, printTestCase=options.printTestCase,
-            questionToGrade=options.gradeQuestion, display=getDisplay(options.gradeQuestion!=None, options))
+            questionToGrade=options.gradeQuestion, display=getDisplay(options.gradeQuestion!=None and options.jobs <= 1, options),
+            jobs=options.jobs, timingReport=options.timingReport,
+            timingBaseline=options.timingBaseline, timingThreshold=options.timingThreshold)
@@ -0,0 +1,145 @@
+# episodeRunner.py
+# ----------------
+# A lean training loop for gridworld and crawler environments.
+
+
+"""
+EpisodeRunner runs an agent in an environment.Environment episode after
+episode without any display, for training and benchmarks:
+
+    runner = EpisodeRunner(agent, GridworldEnvironment(mdp), discount=0.9)
+    returns = runner.run(1000)
+    print runner.stepsPerSecond()
+
+It works out once which hooks the agent has (startEpisode, observeTransition,
+stopEpisode), and builds the messages of gridworld.runEpisode only if a verbose
+sink such as gridworld.printString is attached.  An episode ends when the
+state has no legal actions, or after maxSteps steps; the crawler never reaches
+such a state, so it needs maxSteps:
+
+    runner = EpisodeRunner(agent, crawlerEnvironment(), maxSteps=1000)
+
+Unlike gridworld.runEpisode, it calls stopEpisode at the end of every episode,
+so a learning agent stops exploring and learning after numTraining episodes.
+"""
+
+import time
+
+class NullCanvas:
+    "Just enough of a Tk canvas for crawler.CrawlingRobot to run headless"
+    def winfo_reqwidth(self): return 1000
+    def winfo_reqheight(self): return 300
+    def create_rectangle(self, *args, **kwargs): return 0
+    def create_polygon(self, *args, **kwargs): return 0
+    def create_line(self, *args, **kwargs): return 0
+
+def crawlerEnvironment():
+    "A crawler.CrawlingRobotEnvironment without a window"
+    import crawler
+    return crawler.CrawlingRobotEnvironment(crawler.CrawlingRobot(NullCanvas()))
+
+def agentHook(agent, name):
+    "The bound method name of agent, or a function doing nothing"
+    if hasattr(agent, name): return getattr(agent, name)
+    return lambda *args: None
+
+class EpisodeRunner:
+    """
+    Runs episodes of agent in environment, discounting rewards by discount.
+    decision(state) chooses the actions, agent.getAction by default; verbose,
+    if given, receives the same messages as gridworld.runEpisode prints.
+    steps and elapsed accumulate over all runs.
+    """
+
+    def __init__(self, agent, environment, discount=1.0, decision=None, verbose=None, maxSteps=None):
+        self.agent = agent
+        self.environment = environment
+        self.discount = discount
+        self.decision = decision or agent.getAction
+        self.verbose = verbose
+        self.maxSteps = maxSteps
+        self.startEpisode = agentHook(agent, 'startEpisode')
+        self.observeTransition = agentHook(agent, 'observeTransition')
+        self.stopEpisode = agentHook(agent, 'stopEpisode')
+        self.episodes = 0
+        self.steps = 0
+        self.elapsed = 0.0
+
+    def runEpisode(self):
+        "Runs one episode and returns its discounted return"
+        environment, decision, observe = self.environment, self.decision, self.observeTransition
+        getState, getActions, doAction = environment.getCurrentState, environment.getPossibleActions, environment.doAction
+        verbose, discount = self.verbose, self.discount
+        maxSteps = self.maxSteps
+        if maxSteps == None: maxSteps = float('inf')
+
+        self.episodes += 1
+        returns, totalDiscount, steps = 0, 1.0, 0
+        environment.reset()
+        self.startEpisode()
+        if verbose: verbose("BEGINNING EPISODE: "+str(self.episodes)+"\n")
+        state = getState()
+        while steps < maxSteps and len(getActions(state)) > 0:
+            action = decision(state)
+            if action == None:
+                raise Exception('Agent returned None action')
+            nextState, reward = doAction(action)
+            if verbose:
+                verbose("Started in state: "+str(state)+
+                        "\nTook action: "+str(action)+
+                        "\nEnded in state: "+str(nextState)+
+                        "\nGot reward: "+str(reward)+"\n")
+            observe(state, action, nextState, reward)
+            returns += reward * totalDiscount
+            totalDiscount *= discount
+            steps += 1
+            state = getState()
+        if verbose: verbose("EPISODE "+str(self.episodes)+" COMPLETE: RETURN WAS "+str(returns)+"\n")
+        self.stopEpisode()
+        self.steps += steps
+        return returns
+
+    def run(self, episodes):
+        "Runs episodes episodes back to back and returns the list of their returns"
+        start = time.time()
+        returns = [self.runEpisode() for episode in range(episodes)]
+        self.elapsed += time.time() - start
+        return returns
+
+    def stepsPerSecond(self):
+        return self.steps / max(self.elapsed, 1e-9)
+
+if __name__ == '__main__':
+    import optparse
+    import random
+    import agentRegistry
+    import gridworld
+
+    parser = optparse.OptionParser(description = 'Train a Q-learning agent headless and report steps per second')
+    parser.add_option('-g', '--grid', dest = 'grid', default = 'BookGrid',
+                      help = 'gridworld to learn, or \'crawler\' (default %default)')
+    parser.add_option('-k', '--episodes', dest = 'episodes', type = 'int', default = 1000,
+                      help = 'number of episodes (default %default)')
+    parser.add_option('-m', '--max-steps', dest = 'maxSteps', type = 'int', default = 1000,
+                      help = 'step limit of each episode (default %default)')
+    parser.add_option('-v', '--verbose', action = 'store_true', dest = 'verbose', default = False,
+                      help = 'print every transition, as gridworld.py does')
+    parser.add_option('--seed', dest = 'seed', type = 'int', default = 0,
+                      help = 'random seed (default %default)')
+    options, _ = parser.parse_args()
+
+    random.seed(options.seed)
+    if options.grid == 'crawler':
+        environment = crawlerEnvironment()
+        actionFn, discount = environment.getPossibleActions, 0.8
+    else:
+        mdp = getattr(gridworld, 'get' + options.grid)()
+        environment = gridworld.GridworldEnvironment(mdp)
+        actionFn, discount = mdp.getPossibleActions, 0.9
+    agent = agentRegistry.getAgent('QLearningAgent')(actionFn=actionFn, gamma=discount, alpha=0.5,
+                                                      epsilon=0.3, numTraining=options.episodes)
+    runner = EpisodeRunner(agent, environment, discount, maxSteps=options.maxSteps,
+                           verbose=options.verbose and gridworld.printString or None)
+    returns = runner.run(options.episodes)
+    print '%d episodes, %d steps in %.2f seconds: %.0f steps/second, average return %.4f' % \
+        (options.episodes, runner.steps, runner.elapsed, runner.stepsPerSecond(), sum(returns) / len(returns))
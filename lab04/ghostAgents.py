@@ -18,6 +18,7 @@ from game import Directions
 import random
 from util import manhattanDistance
 import util
+from agentRegistry import registerAgent
 
 class GhostAgent( Agent ):
     def __init__( self, index ):
@@ -34,6 +35,7 @@ class GhostAgent( Agent ):
         "Returns a Counter encoding a distribution over actions from the provided state."
         util.raiseNotDefined()
 
+@registerAgent
 class RandomGhost( GhostAgent ):
     "A ghost that chooses a legal action uniformly at random."
     def getDistribution( self, state ):
@@ -42,6 +44,7 @@ class RandomGhost( GhostAgent ):
         dist.normalize()
         return dist
 
+@registerAgent
 class DirectionalGhost( GhostAgent ):
     "A ghost that prefers to rush Pacman, or flee when scared."
     def __init__( self, index, prob_attack=0.8, prob_scaredFlee=0.8 ):
@@ -22,6 +22,11 @@ import optparse
 class Gridworld(mdp.MarkovDecisionProcess):
     """
       Gridworld
+
+      The transitions and rewards of every state are compiled into
+      tables of tuples on first use and reused until setNoise or
+      setLivingReward is called, so the grid must not be changed
+      after that.
     """
     def __init__(self, grid):
         # layout
@@ -32,6 +37,10 @@ class Gridworld(mdp.MarkovDecisionProcess):
         self.livingReward = 0.0
         self.noise = 0.2
 
+        # compiled model: (state, action) -> transitions, state -> reward
+        self.transitions = None
+        self.rewards = None
+
     def setLivingReward(self, reward):
         """
         The (negative) reward for exiting "normal" states.
@@ -41,12 +50,14 @@ class Gridworld(mdp.MarkovDecisionProcess):
         future rewards.
         """
         self.livingReward = reward
+        self.rewards = None
 
     def setNoise(self, noise):
         """
         The probability of moving in an unintended direction.
         """
         self.noise = noise
+        self.transitions = None
 
 
     def getPossibleActions(self, state):
@@ -85,6 +96,13 @@ class Gridworld(mdp.MarkovDecisionProcess):
         departed (as in the R+N book examples, which more or
         less use this convention).
         """
+        if self.rewards == None:
+            self.rewards = dict([(s, self.computeReward(s)) for s in self.getStates()])
+        if state in self.rewards:
+            return self.rewards[state]
+        return self.computeReward(state)
+
+    def computeReward(self, state):
         if state == self.grid.terminalState:
             return 0.0
         x, y = state
@@ -117,8 +135,20 @@ class Gridworld(mdp.MarkovDecisionProcess):
         representing the states reachable
         from 'state' by taking 'action' along
         with their transition probabilities.
-        """
 
+        The pairs come from the compiled table, as a tuple.
+        """
+        if self.transitions == None:
+            self.transitions = {}
+            for s in self.getStates():
+                for a in self.getPossibleActions(s):
+                    self.transitions[(s, a)] = tuple(self.computeTransitionStatesAndProbs(s, a))
+        key = (state, action)
+        if key in self.transitions:
+            return self.transitions[key]
+        return self.computeTransitionStatesAndProbs(state, action)
+
+    def computeTransitionStatesAndProbs(self, state, action):
         if action not in self.getPossibleActions(state):
             raise "Illegal action!"
 
@@ -409,6 +439,12 @@ def parseOptions():
     optParser.add_option('-a', '--agent',action='store', metavar="A",
                          type='string',dest='agent',default="random",
                          help='Agent type (options are \'random\', \'value\' and \'q\', default %default)')
+    optParser.add_option('--solver',action='store', metavar="S",
+                         type='string',dest='solver',default="ValueIterationAgent",
+                         help='Value agent used by -a value, e.g. MatrixValueIterationAgent (default %default)')
+    optParser.add_option('--theta',action='store', metavar="T",
+                         type='float',dest='theta',default=None,
+                         help='Stop value iteration once no value changes by more than T')
     optParser.add_option('-t', '--text',action='store_true',
                          dest='textDisplay',default=False,
                          help='Use text-only ASCII display')
@@ -479,10 +515,14 @@ if __name__ == '__main__':
     # GET THE AGENT
     ###########################
 
-    import valueIterationAgents, qlearningAgents
+    import agentRegistry
     a = None
     if opts.agent == 'value':
-        a = valueIterationAgents.ValueIterationAgent(mdp, opts.discount, opts.iters)
+        a = agentRegistry.getAgent(opts.solver)(mdp, opts.discount, opts.iters, theta=opts.theta)
+        message = '%s: %d ITERATIONS, %d BACKUPS' % (opts.solver, a.iterationsRun, a.backups)
+        if hasattr(a, 'updates'): # agents updating one state at a time
+            message += ', %d STATE UPDATES' % a.updates
+        print message
     elif opts.agent == 'q':
         #env.getPossibleActions, opts.discount, opts.learningRate, opts.epsilon
         #simulationFn = lambda agent, state: simulation.GridworldSimulation(agent,state,mdp)
@@ -492,7 +532,7 @@ if __name__ == '__main__':
                       'alpha': opts.learningRate,
                       'epsilon': opts.epsilon,
                       'actionFn': actionFn}
-        a = qlearningAgents.QLearningAgent(**qLearnOpts)
+        a = agentRegistry.getAgent('QLearningAgent')(**qLearnOpts)
     elif opts.agent == 'random':
         # # No reason to use the random agent without episodes
         if opts.episodes == 0:
@@ -522,7 +562,7 @@ if __name__ == '__main__':
         if not opts.manual and opts.agent == 'value':
             if opts.valueSteps:
                 for i in range(opts.iters):
-                    tempAgent = valueIterationAgents.ValueIterationAgent(mdp, opts.discount, i)
+                    tempAgent = agentRegistry.getAgent(opts.solver)(mdp, opts.discount, i)
                     display.displayValues(tempAgent, message = "VALUES AFTER "+str(i)+" ITERATIONS")
                     display.pause()
 
@@ -0,0 +1,104 @@
+# gridworldGenerator.py
+# ---------------------
+# Random and maze-like Gridworld instances of any size.
+
+
+"""
+Builds Gridworlds far larger than the hand-written grids in gridworld.py, for
+benchmarking MDP solvers (see mdpBenchmark.py):
+
+    mdp = randomGridworld(100, 100, rand=random.Random(0))
+    mdp = mazeGridworld(1000, 1000)
+
+Both put the start in the bottom left corner and an exit worth +10 in the top
+right, and guarantee that the exit can be reached from the start.
+"""
+
+import random
+
+from gridworld import Gridworld, Grid
+
+GOAL_REWARD = 10
+PIT_REWARD = -10
+
+def randomGrid(width, height, wallDensity=0.2, pitDensity=0.02, rand=random):
+    """
+    A grid whose cells are walls with probability wallDensity and exits worth
+    PIT_REWARD with probability pitDensity.  If that cuts the goal off from the
+    start, the cells on a random monotone path between them are cleared.
+    """
+    grid = Grid(width, height)
+    for x in range(width):
+        for y in range(height):
+            r = rand.random()
+            if r < wallDensity:
+                grid[x][y] = '#'
+            elif r < wallDensity + pitDensity:
+                grid[x][y] = PIT_REWARD
+    start, goal = (0, 0), (width - 1, height - 1)
+    if goal not in reachableCells(grid, start):
+        x, y = start
+        while (x, y) != goal:
+            grid[x][y] = ' '
+            if y == goal[1] or (x < goal[0] and rand.random() < 0.5):
+                x += 1
+            else:
+                y += 1
+    grid[start[0]][start[1]] = 'S'
+    grid[goal[0]][goal[1]] = GOAL_REWARD
+    return grid
+
+def mazeGrid(width, height, rand=random):
+    """
+    A perfect maze: the cells with even coordinates are rooms joined by
+    corridors of one cell, carved by a randomized depth-first search, and
+    everything else is wall.  The goal is the room nearest the top right.
+    """
+    grid = Grid(width, height, '#')
+    rooms = [(x, y) for x in range(0, width, 2) for y in range(0, height, 2)]
+    start = (0, 0)
+    grid[0][0] = ' '
+    visited = set([start])
+    stack = [start]
+    while stack:
+        x, y = stack[-1]
+        neighbours = [(x + dx, y + dy) for dx, dy in [(2, 0), (-2, 0), (0, 2), (0, -2)]
+                      if 0 <= x + dx < width and 0 <= y + dy < height and (x + dx, y + dy) not in visited]
+        if len(neighbours) == 0:
+            stack.pop()
+            continue
+        nx, ny = rand.choice(neighbours)
+        grid[(x + nx) // 2][(y + ny) // 2] = ' '
+        grid[nx][ny] = ' '
+        visited.add((nx, ny))
+        stack.append((nx, ny))
+    goal = max(rooms, key=lambda room: room[0] + room[1])
+    grid[start[0]][start[1]] = 'S'
+    grid[goal[0]][goal[1]] = GOAL_REWARD
+    return grid
+
+def reachableCells(grid, start):
+    "The cells reachable from start without passing walls or exits"
+    seen = set([start])
+    fringe = [start]
+    while fringe:
+        x, y = fringe.pop()
+        if type(grid[x][y]) == int and (x, y) != start: continue # exits end the episode
+        for cell in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]:
+            cx, cy = cell
+            if 0 <= cx < grid.width and 0 <= cy < grid.height and cell not in seen and grid[cx][cy] != '#':
+                seen.add(cell)
+                fringe.append(cell)
+    return seen
+
+def randomGridworld(width, height, wallDensity=0.2, pitDensity=0.02, rand=random):
+    return Gridworld(randomGrid(width, height, wallDensity, pitDensity, rand))
+
+def mazeGridworld(width, height, rand=random):
+    return Gridworld(mazeGrid(width, height, rand))
+
+def makeGridworld(kind, width, height, rand=random):
+    "A 'random' or 'maze' Gridworld"
+    if kind == 'random': return randomGridworld(width, height, rand=rand)
+    if kind == 'maze': return mazeGridworld(width, height, rand)
+    raise Exception('Unknown kind of grid: ' + kind)
@@ -15,7 +15,9 @@
 from game import Agent
 from game import Directions
 import random
+from agentRegistry import registerAgent
 
+@registerAgent
 class KeyboardAgent(Agent):
     """
     An agent controlled by the keyboard.
@@ -64,6 +66,7 @@ class KeyboardAgent(Agent):
         if   (self.SOUTH_KEY in self.keys or 'Down' in self.keys) and Directions.SOUTH in legal: move = Directions.SOUTH
         return move
 
+@registerAgent
 class KeyboardAgent2(KeyboardAgent):
     """
     A second agent controlled by the keyboard.
@@ -0,0 +1,133 @@
+# learningCurves.py
+# -----------------
+# Learning curves of Q-learning agents averaged over independent seeds.
+
+
+"""
+Trains a Q-learning agent from scratch several times, each run with its own
+random seed, in a pool of worker processes, and reports the mean return of
+every episode across the runs with a 95% confidence band:
+
+> python learningCurves.py -g BookGrid -n 16 -k 200
+> python learningCurves.py -g crawler -a ApproximateQAgent -n 8 -k 50 -o crawler.csv
+
+Run r uses the seed seed + r, so the curve does not depend on the number of
+worker processes.  The band is the mean plus or minus 1.96 standard errors,
+the normal approximation, which is narrow when only a few runs are averaged.
+"""
+
+import math
+import multiprocessing
+import random
+
+import agentRegistry
+import gridworld
+from episodeRunner import EpisodeRunner, crawlerEnvironment
+
+DEFAULT_CONFIG = {'environment': 'BookGrid', 'agent': 'QLearningAgent', 'epsilon': 0.3,
+                  'alpha': 0.5, 'discount': 0.9, 'episodes': 100, 'maxSteps': 1000,
+                  'extractor': 'IdentityExtractor'}
+
+def runSeed(args):
+    """
+    Trains one agent with the settings in config for config['episodes']
+    episodes and returns the return of each episode.  args is (config, seed),
+    so that runSeed can be passed to Pool.map.
+    """
+    config, seed = args
+    random.seed(seed)
+    if config['environment'] == 'crawler':
+        environment = crawlerEnvironment()
+        actionFn = environment.getPossibleActions
+    else:
+        mdp = getattr(gridworld, 'get' + config['environment'])()
+        environment = gridworld.GridworldEnvironment(mdp)
+        actionFn = mdp.getPossibleActions
+    agentArgs = {'actionFn': actionFn, 'epsilon': config['epsilon'], 'alpha': config['alpha'],
+                 'gamma': config['discount'], 'numTraining': config['episodes']}
+    if config['agent'] == 'ApproximateQAgent':
+        agentArgs['extractor'] = config['extractor']
+    agent = agentRegistry.getAgent(config['agent'])(**agentArgs)
+    runner = EpisodeRunner(agent, environment, config['discount'], maxSteps=config['maxSteps'])
+    return runner.run(config['episodes'])
+
+def runSeeds(config, runs, seed=0, jobs=1):
+    "The returns of every episode of runs runs, one list per run"
+    tasks = [(config, seed + r) for r in range(runs)]
+    if jobs <= 1 or runs < 2:
+        return map(runSeed, tasks)
+    pool = multiprocessing.Pool(min(jobs, runs))
+    try:
+        return pool.map(runSeed, tasks)
+    finally:
+        pool.close()
+        pool.join()
+
+def learningCurve(returns):
+    """
+    For each episode, (mean, lower, upper) of its return over the runs in
+    returns, the bounds being 1.96 standard errors either side of the mean.
+    """
+    curve = []
+    for episodeReturns in zip(*returns):
+        n = len(episodeReturns)
+        mean = sum(episodeReturns) / float(n)
+        if n > 1:
+            variance = sum([(r - mean) ** 2 for r in episodeReturns]) / (n - 1)
+            halfWidth = 1.96 * math.sqrt(variance / n)
+        else:
+            halfWidth = 0.0
+        curve.append((mean, mean - halfWidth, mean + halfWidth))
+    return curve
+
+def writeCurve(curve, path):
+    "Writes curve as CSV: episode, mean, lower, upper"
+    with open(path, 'w') as f:
+        f.write('episode,mean,lower,upper\n')
+        for episode, (mean, lower, upper) in enumerate(curve):
+            f.write('%d,%r,%r,%r\n' % (episode + 1, mean, lower, upper))
+
+if __name__ == '__main__':
+    import optparse
+    import time
+
+    parser = optparse.OptionParser(description = 'Average Q-learning curves over independent seeds')
+    parser.add_option('-g', '--grid', dest = 'environment', default = DEFAULT_CONFIG['environment'],
+                      help = 'gridworld to learn, or \'crawler\' (default %default)')
+    parser.add_option('-a', '--agent', dest = 'agent', default = DEFAULT_CONFIG['agent'],
+                      help = 'QLearningAgent or ApproximateQAgent (default %default)')
+    parser.add_option('-x', '--extractor', dest = 'extractor', default = DEFAULT_CONFIG['extractor'],
+                      help = 'feature extractor of ApproximateQAgent (default %default)')
+    parser.add_option('-e', '--epsilon', dest = 'epsilon', type = 'float', default = DEFAULT_CONFIG['epsilon'],
+                      help = 'chance of a random action (default %default)')
+    parser.add_option('-l', '--learningRate', dest = 'alpha', type = 'float', default = DEFAULT_CONFIG['alpha'],
+                      help = 'learning rate (default %default)')
+    parser.add_option('-d', '--discount', dest = 'discount', type = 'float', default = DEFAULT_CONFIG['discount'],
+                      help = 'discount (default %default)')
+    parser.add_option('-k', '--episodes', dest = 'episodes', type = 'int', default = DEFAULT_CONFIG['episodes'],
+                      help = 'episodes per run (default %default)')
+    parser.add_option('-m', '--max-steps', dest = 'maxSteps', type = 'int', default = DEFAULT_CONFIG['maxSteps'],
+                      help = 'step limit of each episode (default %default)')
+    parser.add_option('-n', '--runs', dest = 'runs', type = 'int', default = 10,
+                      help = 'number of independent runs (default %default)')
+    parser.add_option('-j', '--jobs', dest = 'jobs', type = 'int', default = multiprocessing.cpu_count(),
+                      help = 'worker processes (default %default, the number of CPUs)')
+    parser.add_option('--seed', dest = 'seed', type = 'int', default = 0,
+                      help = 'seed of the first run (default %default)')
+    parser.add_option('--every', dest = 'every', type = 'int', default = 10,
+                      help = 'print every this many episodes (default %default)')
+    parser.add_option('-o', '--output', dest = 'output', default = None,
+                      help = 'also write the whole curve to this CSV file')
+    options, _ = parser.parse_args()
+
+    config = dict([(key, getattr(options, key)) for key in DEFAULT_CONFIG])
+    start = time.time()
+    curve = learningCurve(runSeeds(config, options.runs, options.seed, options.jobs))
+    print '%s on %s, %d runs of %d episodes in %.2f seconds' % \
+        (options.agent, options.environment, options.runs, options.episodes, time.time() - start)
+    print '%8s %12s %12s %12s' % ('episode', 'mean', 'lower', 'upper')
+    for episode, (mean, lower, upper) in enumerate(curve):
+        if (episode + 1) % options.every == 0 or episode == 0:
+            print '%8d %12.4f %12.4f %12.4f' % (episode + 1, mean, lower, upper)
+    if options.output != None:
+        writeCurve(curve, options.output)
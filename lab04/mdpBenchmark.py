@@ -0,0 +1,131 @@
+# mdpBenchmark.py
+# ---------------
+# Times MDP solvers and Q-learning on generated gridworlds of growing size.
+
+
+"""
+For each grid size, generates a gridworld (gridworldGenerator.py) and runs every
+solver on it until convergence, and QLearningAgent for some episodes, each in a
+fresh worker process so that memory is measured per run and a run that takes too
+long can be stopped:
+
+> python mdpBenchmark.py -s 10,30,100,300 -k maze
+> python mdpBenchmark.py -s 1000 --solvers MatrixValueIterationAgent,PolicyIterationAgent
+
+For each run it reports the iterations until no value changed by more than
+theta, the state backups (Q-learning updates) done, the time, the backups per
+second and the growth of the peak resident memory.  A solver that runs past the
+time budget is stopped and skipped at the larger sizes.
+"""
+
+import multiprocessing
+import optparse
+import random
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None # memory is not reported
+
+import agentRegistry
+import gridworld
+import gridworldGenerator
+from episodeRunner import EpisodeRunner
+
+SOLVERS = ['ValueIterationAgent', 'MatrixValueIterationAgent', 'AsynchronousValueIterationAgent',
+           'PrioritizedSweepingValueIterationAgent', 'PolicyIterationAgent']
+
+_mdp = None # the gridworld of the current size, inherited by the workers
+
+def peakMemory():
+    "Peak resident memory of this process in KB, or None"
+    if resource == None: return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def runSolver(name, discount, iterations, theta):
+    "Returns (iterations, backups, seconds, memory KB) of one solver run"
+    memory = peakMemory()
+    start = time.time()
+    agent = agentRegistry.getAgent(name)(_mdp, discount, iterations, theta=theta)
+    elapsed = time.time() - start
+    if memory != None: memory = peakMemory() - memory
+    return agent.iterationsRun, agent.backups, elapsed, memory
+
+def runQLearning(episodes, maxSteps, seed):
+    "Returns (episodes, updates, seconds, memory KB) of Q-learning episodes"
+    random.seed(seed)
+    memory = peakMemory()
+    start = time.time()
+    agent = agentRegistry.getAgent('QLearningAgent')(actionFn=_mdp.getPossibleActions,
+                                                      epsilon=0.3, alpha=0.5, gamma=0.9, numTraining=episodes)
+    runner = EpisodeRunner(agent, gridworld.GridworldEnvironment(_mdp), 0.9, maxSteps=maxSteps)
+    runner.run(episodes)
+    elapsed = time.time() - start
+    if memory != None: memory = peakMemory() - memory
+    return episodes, runner.steps, elapsed, memory
+
+def runIsolated(function, args, budget):
+    "Runs function in a new worker process; None if it takes over budget seconds"
+    pool = multiprocessing.Pool(1)
+    try:
+        return pool.apply_async(function, args).get(budget)
+    except multiprocessing.TimeoutError:
+        return None
+    finally:
+        pool.terminate()
+        pool.join()
+
+def formatRun(name, result):
+    if result == None:
+        return '  %-40s over the time budget' % name
+    iterations, backups, seconds, memory = result
+    memory = memory == None and '?' or '%.1f' % (memory / 1024.0)
+    return '  %-40s %6d it %10d backups %8.2f s %10.0f backups/s %8s MB' % \
+        (name, iterations, backups, seconds, backups / max(seconds, 1e-9), memory)
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description = 'Benchmark MDP solvers on generated gridworlds')
+    parser.add_option('-s', '--sizes', dest = 'sizes', default = '10,30,100',
+                      help = 'comma-separated grid widths; grids are square (default %default)')
+    parser.add_option('-k', '--kind', dest = 'kind', default = 'random',
+                      help = '\'random\' or \'maze\' (default %default)')
+    parser.add_option('--solvers', dest = 'solvers', default = ','.join(SOLVERS),
+                      help = 'comma-separated registered value agents (default all)')
+    parser.add_option('-d', '--discount', dest = 'discount', type = 'float', default = 0.9,
+                      help = 'discount (default %default)')
+    parser.add_option('-r', '--livingReward', dest = 'livingReward', type = 'float', default = -0.1,
+                      help = 'living reward; below 0 so that greedy Q-learning keeps exploring (default %default)')
+    parser.add_option('-i', '--iterations', dest = 'iterations', type = 'int', default = 10000,
+                      help = 'iteration limit of each solver (default %default)')
+    parser.add_option('--theta', dest = 'theta', type = 'float', default = 1e-6,
+                      help = 'convergence threshold on the largest value change (default %default)')
+    parser.add_option('-e', '--episodes', dest = 'episodes', type = 'int', default = 20,
+                      help = 'Q-learning episodes, 0 to skip Q-learning (default %default)')
+    parser.add_option('--max-steps', dest = 'maxSteps', type = 'int', default = 100000,
+                      help = 'step limit of each Q-learning episode (default %default)')
+    parser.add_option('-b', '--budget', dest = 'budget', type = 'float', default = 120,
+                      help = 'seconds allowed for each run (default %default)')
+    parser.add_option('--seed', dest = 'seed', type = 'int', default = 0,
+                      help = 'random seed (default %default)')
+    options, _ = parser.parse_args()
+
+    runs = [(name, runSolver, (name, options.discount, options.iterations, options.theta))
+            for name in options.solvers.split(',') if name]
+    if options.episodes > 0:
+        runs.append(('QLearningAgent (%d episodes)' % options.episodes, runQLearning,
+                     (options.episodes, options.maxSteps, options.seed)))
+    overBudget = set()
+    for size in [int(s) for s in options.sizes.split(',')]:
+        start = time.time()
+        _mdp = gridworldGenerator.makeGridworld(options.kind, size, size, random.Random(options.seed))
+        _mdp.setLivingReward(options.livingReward)
+        states = len(_mdp.getStates())
+        print '%s grid %dx%d: %d states, generated in %.2f s' % (options.kind, size, size, states, time.time() - start)
+        for name, function, args in runs:
+            if name in overBudget:
+                print '  %-40s skipped' % name
+                continue
+            result = runIsolated(function, args, options.budget)
+            if result == None: overBudget.add(name)
+            print formatRun(name, result)
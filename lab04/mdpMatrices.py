@@ -0,0 +1,204 @@
+# mdpMatrices.py
+# --------------
+# Compiles a finite MDP into transition matrices for matrix-form value iteration.
+
+
+"""
+MDPMatrices numbers the states of an mdp.MarkovDecisionProcess once and
+turns it into, for each action a, a transition matrix P[a] and an expected
+reward vector R[a]:
+
+    P[a][s, s'] = T(s, a, s')
+    R[a][s]     = sum over s' of T(s, a, s') R(s, a, s')
+
+so that one round of value iteration is
+
+    V'(s) = max over legal a of R[a][s] + discount * (P[a] V)[s]
+
+and a state with no legal actions gets the value 0, as in ValueIterationAgent.
+evaluate and greedyPolicy do the two steps of policy iteration on the same
+matrices.
+
+The matrices are scipy.sparse CSR matrices when SciPy is installed and NumPy
+arrays when only NumPy is.  Without NumPy the same sparse rows are kept as
+Python lists, which still avoids calling the MDP and building a util.Counter
+for every state in every iteration.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None # the rows are kept as lists instead
+
+try:
+    import scipy.sparse
+    import scipy.sparse.linalg
+except ImportError:
+    scipy = None
+
+class MDPMatrices:
+    """
+    The transition matrices and expected rewards of mdp, one of each for every
+    action legal in some state.  Rows of states where an action is illegal are
+    empty and masked out of the max.
+    """
+
+    def __init__(self, mdp):
+        self.states = list(mdp.getStates())
+        self.stateIndex = dict([(s, i) for i, s in enumerate(self.states)])
+        self.actions = []
+        self.rows = {} # action -> [(state index, next state indices, probabilities, expected reward)]
+        self.stateActions = [] # state index -> legal actions
+        for i, state in enumerate(self.states):
+            self.stateActions.append(tuple(mdp.getPossibleActions(state)))
+            for action in self.stateActions[i]:
+                if action not in self.rows:
+                    self.actions.append(action)
+                    self.rows[action] = []
+                indices, probabilities, reward = [], [], 0.0
+                for nextState, probability in mdp.getTransitionStatesAndProbs(state, action):
+                    indices.append(self.stateIndex[nextState])
+                    probabilities.append(probability)
+                    reward += probability * mdp.getReward(state, action, nextState)
+                self.rows[action].append((i, indices, probabilities, reward))
+        self.transitions = {} # (state index, action) -> row of self.rows[action]
+        for action in self.actions:
+            for row in self.rows[action]:
+                self.transitions[(row[0], action)] = row
+        if numpy != None: self.buildArrays()
+
+    def buildArrays(self):
+        "The NumPy (or SciPy) form of self.rows"
+        n = len(self.states)
+        self.P, self.R, self.legal = {}, {}, {}
+        for action in self.actions:
+            rows, columns, data = [], [], []
+            R = numpy.zeros(n)
+            legal = numpy.zeros(n, dtype=bool)
+            for i, indices, probabilities, reward in self.rows[action]:
+                rows.extend([i] * len(indices))
+                columns.extend(indices)
+                data.extend(probabilities)
+                R[i] = reward
+                legal[i] = True
+            if scipy != None:
+                self.P[action] = scipy.sparse.csr_matrix((data, (rows, columns)), shape=(n, n))
+            else:
+                P = numpy.zeros((n, n))
+                numpy.add.at(P, (rows, columns), data)
+                self.P[action] = P
+            self.R[action] = R
+            self.legal[action] = legal
+        self.anyLegal = numpy.zeros(n, dtype=bool)
+        for action in self.actions:
+            self.anyLegal |= self.legal[action]
+
+    def zeros(self):
+        "A value vector of zeros"
+        if numpy != None: return numpy.zeros(len(self.states))
+        return [0.0] * len(self.states)
+
+    def backup(self, values, discount):
+        "One round of value iteration: the new value vector computed from values"
+        if numpy != None:
+            best = numpy.empty(len(self.states))
+            best.fill(-numpy.inf)
+            for action in self.actions:
+                q = self.R[action] + discount * self.P[action].dot(values)
+                best = numpy.where(self.legal[action], numpy.maximum(best, q), best)
+            return numpy.where(self.anyLegal, best, 0.0)
+        best = [None] * len(self.states)
+        for action in self.actions:
+            for i, indices, probabilities, reward in self.rows[action]:
+                expected = 0.0
+                for j, p in zip(indices, probabilities):
+                    expected += p * values[j]
+                q = reward + discount * expected
+                if best[i] == None or q > best[i]: best[i] = q
+        return [b if b != None else 0.0 for b in best]
+
+    def qValue(self, i, action, values, discount):
+        "Q(s, action) under values, for the state s with index i"
+        _, indices, probabilities, reward = self.transitions[(i, action)]
+        expected = 0.0
+        for j, p in zip(indices, probabilities):
+            expected += p * values[j]
+        return reward + discount * expected
+
+    def evaluate(self, policy, discount, values, theta=1e-10, maxSweeps=10000):
+        """
+        The values of following policy (a legal action or None for each state
+        index).  With NumPy this solves the linear system (I - discount P) V = R
+        of the policy; otherwise, or if that system is singular, it sweeps in
+        place from values until no value changes by more than theta.  Returns
+        the values and the number of sweeps.
+        """
+        if numpy != None:
+            try:
+                return self.solve(policy, discount), 0
+            except numpy.linalg.LinAlgError:
+                values = numpy.array(values, dtype=float) # improper policy, evaluated by sweeps
+        values = list(values)
+        for sweep in range(1, maxSweeps + 1):
+            residual = 0.0
+            for i, action in enumerate(policy):
+                if action == None: continue
+                value = self.qValue(i, action, values, discount)
+                residual = max(residual, abs(value - values[i]))
+                values[i] = value
+            if residual <= theta: break
+        if numpy != None: values = numpy.array(values)
+        return values, sweep
+
+    def solve(self, policy, discount):
+        "Solves (I - discount P) V = R for the transitions and rewards of policy"
+        n = len(self.states)
+        rows, columns, data = [], [], []
+        R = numpy.zeros(n)
+        for i, action in enumerate(policy):
+            if action == None: continue
+            _, indices, probabilities, reward = self.transitions[(i, action)]
+            rows.extend([i] * len(indices))
+            columns.extend(indices)
+            data.extend(probabilities)
+            R[i] = reward
+        if scipy != None:
+            P = scipy.sparse.csr_matrix((data, (rows, columns)), shape=(n, n))
+            A = (scipy.sparse.identity(n, format='csr') - discount * P).tocsc()
+            values = scipy.sparse.linalg.spsolve(A, R)
+            if not numpy.all(numpy.isfinite(values)): raise numpy.linalg.LinAlgError('singular policy system')
+            return values
+        P = numpy.zeros((n, n))
+        numpy.add.at(P, (rows, columns), data)
+        return numpy.linalg.solve(numpy.identity(n) - discount * P, R)
+
+    def greedyPolicy(self, values, discount, policy):
+        """
+        The greedy policy for values.  A state keeps its action in policy
+        unless another action is better by more than rounding error, so that
+        policy iteration cannot cycle between tied actions.
+        """
+        improved = []
+        for i, actions in enumerate(self.stateActions):
+            if len(actions) == 0:
+                improved.append(None)
+                continue
+            best = policy[i]
+            bestValue = self.qValue(i, best, values, discount)
+            for action in actions:
+                q = self.qValue(i, action, values, discount)
+                if q > bestValue + 1e-12 * max(1.0, abs(bestValue)):
+                    best, bestValue = action, q
+            improved.append(best)
+        return improved
+
+    def valueDict(self, values, counter):
+        "Stores values in counter (a util.Counter) keyed by state"
+        for state, value in zip(self.states, values):
+            counter[state] = float(value)
+        return counter
+
+def maxResidual(values, newValues):
+    "The largest change between two value vectors"
+    if numpy != None: return float(numpy.abs(newValues - values).max())
+    return max([0.0] + [abs(new - old) for old, new in zip(values, newValues)])
@@ -12,12 +12,14 @@
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
 
 
-from pacman import Directions
+from game import Directions
 from game import Agent
 import random
 import game
 import util
+from agentRegistry import registerAgent
 
+@registerAgent
 class LeftTurnAgent(game.Agent):
     "An agent that turns left at every opportunity"
 
@@ -32,6 +34,7 @@ class LeftTurnAgent(game.Agent):
         if Directions.LEFT[left] in legal: return Directions.LEFT[left]
         return Directions.STOP
 
+@registerAgent
 class GreedyAgent(Agent):
     def __init__(self, evalFn="scoreEvaluation"):
         self.evaluationFunction = util.lookup(evalFn, globals())
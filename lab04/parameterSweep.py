@@ -0,0 +1,277 @@
+# parameterSweep.py
+# -----------------
+# Searches grids of MDP or Q-learning parameters for configurations with a
+# wanted outcome.
+
+
+"""
+Evaluates every combination of the given parameter values, in a pool of worker
+processes, and lists the configurations whose outcome satisfies a predicate.
+
+Gridworld sweeps vary (discount, noise, livingReward), run a value agent on
+the grid and record its policy and the path that policy follows from the start
+without noise, as the analysis tests do.  The predicate is either a GridPolicyTest
+file, to find answers for analysis.py:
+
+> python parameterSweep.py --test test_cases/q3/1-question-3.1.test
+
+or a Python expression over discount, noise, livingReward, policy, path,
+action(x, y) and visits(x, y):
+
+> python parameterSweep.py -g BridgeGrid --noises 0,0.01,0.1,0.2 -w "visits(5, 1)"
+
+Pacman sweeps vary (epsilon, alpha, numTraining), train a PacmanQAgent with
+pacman.runGames and then play some test games; the predicate may use epsilon,
+alpha, numTraining, scores, wins, winRate and averageScore:
+
+> python parameterSweep.py --pacman smallGrid --numTraining 100,500,2000 -w "winRate >= 0.8"
+
+Results are cached in .parameterSweep.cache, keyed by a hash of the
+configuration, which includes the grid or layout and the mtime and size of the
+agent and environment sources, so only new configurations are evaluated.
+"""
+
+import atexit
+import hashlib
+import multiprocessing
+import os
+import pickle
+import random
+import sys
+
+import agentRegistry
+
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.parameterSweep.cache')
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+GRIDWORLD_SOURCES = ['gridworld.py', 'valueIterationAgents.py', 'mdpMatrices.py']
+PACMAN_SOURCES = ['pacman.py', 'game.py', 'ghostAgents.py', 'qlearningAgents.py', 'learningAgents.py']
+
+def codeStamp(sources):
+    "The mtime and size of each of the source files, to invalidate cached results"
+    return tuple([tuple([name] + agentRegistry.fileStamp(os.path.join(DIRECTORY, name))) for name in sources])
+
+def configKey(config):
+    return hashlib.sha1(repr(sorted(config.items()))).hexdigest()
+
+class ResultCache:
+    """
+    Results of earlier sweeps keyed by configKey, read on first use and
+    written back at exit if anything was added.  With path None nothing is
+    read or written.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.results = None
+        self.dirty = False
+
+    def load(self):
+        self.results = {}
+        if self.path == None: return
+        try:
+            with open(self.path, 'rb') as handle:
+                self.results = pickle.load(handle)
+        except Exception:
+            pass # a missing or unreadable cache is rebuilt
+        atexit.register(self.save)
+
+    def get(self, config):
+        if self.results == None: self.load()
+        return self.results.get(configKey(config))
+
+    def put(self, config, result):
+        if self.results == None: self.load()
+        self.results[configKey(config)] = result
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty: return
+        temporary = '%s.%d' % (self.path, os.getpid())
+        try:
+            with open(temporary, 'wb') as handle:
+                pickle.dump(self.results, handle, 2)
+            os.rename(temporary, self.path)
+            self.dirty = False
+        except (IOError, OSError):
+            pass # caching is an optimization only
+
+def gridRows(grid):
+    "A gridworld.Grid as a tuple of rows, top row first, as gridworld.makeGrid takes"
+    return tuple([tuple(row) for row in grid._getLegacyText()])
+
+def gridworldConfigs(rows, discounts, noises, livingRewards, solver='ValueIterationAgent', iterations=100):
+    "Every combination of the parameter values on the grid given by rows"
+    code = codeStamp(GRIDWORLD_SOURCES)
+    return [{'kind': 'gridworld', 'grid': rows, 'discount': d, 'noise': n, 'livingReward': r,
+             'solver': solver, 'iterations': iterations, 'code': code}
+            for d in discounts for n in noises for r in livingRewards]
+
+def pacmanConfigs(layoutName, epsilons, alphas, numTrainings, numTest=100, discount=0.8, seed=0):
+    "Every combination of the Q-learning parameter values on the layout"
+    code = codeStamp(PACMAN_SOURCES)
+    return [{'kind': 'pacman', 'layout': layoutName, 'epsilon': e, 'alpha': a, 'numTraining': t,
+             'numTest': numTest, 'discount': discount, 'seed': seed, 'code': code}
+            for e in epsilons for a in alphas for t in numTrainings]
+
+def evaluateGridworld(config):
+    import gridworld
+    from reinforcementTestClasses import followPath
+    mdp = gridworld.Gridworld(gridworld.makeGrid([list(row) for row in config['grid']]))
+    mdp.setNoise(config['noise'])
+    mdp.setLivingReward(config['livingReward'])
+    agent = agentRegistry.getAgent(config['solver'])(mdp, config['discount'], config['iterations'])
+    policy = dict([(state, agent.getPolicy(state)) for state in mdp.getStates()])
+    return {'policy': policy, 'path': followPath(policy, mdp.getStartState())}
+
+def evaluatePacman(config):
+    import layout, pacman, textDisplay
+    from ghostAgents import RandomGhost
+    import StringIO
+    random.seed(config['seed'])
+    theLayout = layout.getLayout(config['layout'])
+    agent = agentRegistry.getAgent('PacmanQAgent')(epsilon=config['epsilon'], alpha=config['alpha'],
+                                                    gamma=config['discount'], numTraining=config['numTraining'])
+    ghosts = [RandomGhost(i + 1) for i in range(theLayout.getNumGhosts())]
+    stdout, sys.stdout = sys.stdout, StringIO.StringIO() # runGames prints every test game
+    try:
+        games = pacman.runGames(theLayout, agent, ghosts, textDisplay.NullGraphics(),
+                                config['numTraining'] + config['numTest'], False, config['numTraining'])
+    finally:
+        sys.stdout = stdout
+    scores = [game.state.getScore() for game in games]
+    wins = [game.state.isWin() for game in games]
+    return {'scores': scores, 'wins': wins.count(True), 'winRate': wins.count(True) / float(max(len(wins), 1)),
+            'averageScore': sum(scores) / float(max(len(scores), 1))}
+
+def evaluate(config):
+    if config['kind'] == 'gridworld': return evaluateGridworld(config)
+    return evaluatePacman(config)
+
+def sweep(configs, jobs=1, cache=None):
+    """
+    Returns (config, result) for every configuration, evaluating those not in
+    cache in jobs worker processes.
+    """
+    if cache == None: cache = ResultCache()
+    missing = [config for config in configs if cache.get(config) == None]
+    if jobs > 1 and len(missing) > 1:
+        pool = multiprocessing.Pool(min(jobs, len(missing)))
+        try:
+            results = pool.map(evaluate, missing)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = map(evaluate, missing)
+    for config, result in zip(missing, results):
+        cache.put(config, result)
+    return [(config, cache.get(config)) for config in configs]
+
+def expressionPredicate(expression):
+    """
+    A predicate evaluating expression with the parameters and results of a
+    configuration as variables, and for gridworld sweeps action(x, y) and
+    visits(x, y).
+    """
+    code = compile(expression, '<predicate>', 'eval')
+    def predicate(config, result):
+        namespace = dict(config)
+        namespace.update(result)
+        if 'policy' in result:
+            namespace['action'] = lambda x, y: result['policy'].get((x, y))
+            namespace['visits'] = lambda x, y: '(%s,%s)' % (x, y) in result['path']
+        return eval(code, {}, namespace)
+    return predicate
+
+def policyTestPredicate(testDict):
+    """
+    The checks of a GridPolicyTest: the policy must take the actions given in
+    its policy grid, and its path must visit pathVisits and avoid pathNotVisits.
+    """
+    from reinforcementTestClasses import parseGrid
+    required = parseGrid(testDict['policy'])
+    actionMap = {'N': 'north', 'E': 'east', 'S': 'south', 'W': 'west', 'X': 'exit'}
+    def predicate(config, result):
+        for x in range(required.width):
+            for y in range(required.height):
+                if required[x][y] in actionMap and result['policy'].get((x, y)) != actionMap[required[x][y]]:
+                    return False
+        if 'pathVisits' in testDict and testDict['pathVisits'] not in result['path']: return False
+        if 'pathNotVisits' in testDict and testDict['pathNotVisits'] in result['path']: return False
+        return True
+    return predicate
+
+def parseValues(text):
+    return [float(value) for value in text.split(',') if value]
+
+if __name__ == '__main__':
+    import optparse
+    import time
+
+    parser = optparse.OptionParser(description = 'Find parameters giving a wanted policy or Q-learning outcome')
+    parser.add_option('--test', dest = 'test', default = None,
+                      help = 'GridPolicyTest file whose grid and policy checks to use')
+    parser.add_option('-g', '--grid', dest = 'grid', default = 'DiscountGrid',
+                      help = 'gridworld to sweep (default %default)')
+    parser.add_option('--discounts', dest = 'discounts', default = '0,0.1,0.3,0.5,0.7,0.9,1',
+                      help = 'discounts to try (default %default)')
+    parser.add_option('--noises', dest = 'noises', default = '0,0.01,0.1,0.2,0.5',
+                      help = 'noises to try (default %default)')
+    parser.add_option('--livingRewards', dest = 'livingRewards', default = '-10,-1,-0.1,0,0.1,1,10',
+                      help = 'living rewards to try (default %default)')
+    parser.add_option('--solver', dest = 'solver', default = 'ValueIterationAgent',
+                      help = 'value agent computing the policies (default %default)')
+    parser.add_option('-i', '--iterations', dest = 'iterations', type = 'int', default = 100,
+                      help = 'iterations of the value agent (default %default)')
+    parser.add_option('--pacman', dest = 'layout', default = None,
+                      help = 'sweep Q-learning parameters of PacmanQAgent on this layout instead')
+    parser.add_option('--epsilons', dest = 'epsilons', default = '0.05,0.1,0.3',
+                      help = 'Pacman exploration rates to try (default %default)')
+    parser.add_option('--alphas', dest = 'alphas', default = '0.1,0.2,0.5',
+                      help = 'Pacman learning rates to try (default %default)')
+    parser.add_option('--numTraining', dest = 'numTrainings', default = '100,500,2000',
+                      help = 'Pacman training episodes to try (default %default)')
+    parser.add_option('--games', dest = 'games', type = 'int', default = 100,
+                      help = 'Pacman test games after training (default %default)')
+    parser.add_option('-w', '--where', dest = 'where', default = None,
+                      help = 'predicate on each configuration\'s outcome, a Python expression')
+    parser.add_option('-j', '--jobs', dest = 'jobs', type = 'int', default = multiprocessing.cpu_count(),
+                      help = 'worker processes (default %default, the number of CPUs)')
+    parser.add_option('--no-cache', dest = 'useCache', action = 'store_false', default = True,
+                      help = 'evaluate every configuration again and keep no results')
+    options, _ = parser.parse_args()
+
+    predicate = lambda config, result: True
+    if options.layout != None:
+        configs = pacmanConfigs(options.layout, parseValues(options.epsilons), parseValues(options.alphas),
+                                [int(t) for t in parseValues(options.numTrainings)], options.games)
+        shown = ['epsilon', 'alpha', 'numTraining']
+    else:
+        if options.test != None:
+            import testParser
+            from reinforcementTestClasses import parseGrid
+            testDict = testParser.TestParser(options.test).parse()
+            rows = gridRows(parseGrid(testDict['grid']))
+            predicate = policyTestPredicate(testDict)
+        else:
+            import gridworld
+            rows = gridRows(getattr(gridworld, 'get' + options.grid)().grid)
+        configs = gridworldConfigs(rows, parseValues(options.discounts), parseValues(options.noises),
+                                   parseValues(options.livingRewards), options.solver, options.iterations)
+        shown = ['discount', 'noise', 'livingReward']
+    if options.where != None:
+        predicate = expressionPredicate(options.where)
+
+    cache = ResultCache(options.useCache and CACHE_FILE or None)
+    start = time.time()
+    missing = len([config for config in configs if cache.get(config) == None])
+    results = sweep(configs, options.jobs, cache)
+    matches = [(config, result) for config, result in results if predicate(config, result)]
+    print '%d configurations (%d evaluated, %d cached) in %.2f seconds; %d match' % \
+        (len(configs), missing, len(configs) - missing, time.time() - start, len(matches))
+    for config, result in matches:
+        line = '  ' + ', '.join(['%s=%s' % (key, config[key]) for key in shown])
+        if 'averageScore' in result:
+            line += ': win rate %.2f, average score %.1f' % (result['winRate'], result['averageScore'])
+        print line
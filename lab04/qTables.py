@@ -0,0 +1,100 @@
+# qTables.py
+# ----------
+# Dense Q-tables for QLearningAgent on small, enumerable state spaces.
+
+
+"""
+A DenseQTable numbers the legal (state, action) pairs once and keeps Q(s, a)
+in one contiguous array of floats instead of a dictionary keyed by (state,
+action) tuples.  Pass one to QLearningAgent to use it:
+
+    agent = QLearningAgent(actionFn=mdp.getPossibleActions, qTable=gridworldQTable(mdp))
+
+The legal actions of each state take consecutive slots, so a state's
+Q-values are one slice of the array, and the max and argmax over them are a
+single max over that slice, with no call to the agent's actionFn.  The array
+is a numpy array when numpy is installed, and an array.array of doubles
+otherwise; both take 8 bytes per Q-value.
+"""
+
+import array
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None # array.array is used instead
+
+class DenseQTable:
+    """
+    Q-values for every state and each of its legal actions, all 0.0 at first.
+    Each state must always have the same legal actions, actionFn(state), as in
+    gridworld and the crawler.  Q-values are read and written like those of a
+    util.Counter keyed by (state, action); reading a pair that is not legal
+    gives 0.0.
+    """
+
+    def __init__(self, states, actionFn):
+        self.rows = {} # state -> (first slot, end of slots, legal actions)
+        size = 0
+        for state in states:
+            actions = tuple(actionFn(state))
+            self.rows[state] = (size, size + len(actions), actions)
+            size += len(actions)
+        self.vectorized = numpy != None
+        if self.vectorized:
+            self.values = numpy.zeros(size)
+        else:
+            self.values = array.array('d', [0.0]) * size
+
+    def __getitem__(self, key):
+        state, action = key
+        start, end, actions = self.rows[state]
+        if action not in actions: return 0.0
+        return float(self.values[start + actions.index(action)])
+
+    def __setitem__(self, key, value):
+        state, action = key
+        start, end, actions = self.rows[state]
+        self.values[start + actions.index(action)] = value
+
+    def maxQValue(self, state):
+        "max over the legal actions of Q(state, action), or 0.0 if there are none"
+        start, end, actions = self.rows[state]
+        if start == end: return 0.0
+        if self.vectorized: return float(self.values[start:end].max())
+        return max(self.values[start:end])
+
+    def bestAction(self, state):
+        """
+        The legal action with the largest Q-value, the first in actionFn's
+        order if several tie, or None if there are no legal actions.
+        """
+        start, end, actions = self.rows[state]
+        if start == end: return None
+        row = self.values[start:end]
+        if self.vectorized: return actions[int(row.argmax())]
+        return actions[row.index(max(row))]
+
+    def __len__(self):
+        return len(self.values)
+
+    def footprint(self):
+        """
+        Approximate memory used in bytes, counted as util.Counter.footprint
+        counts it: the array, the table of rows and the row tuples in it.
+        States and actions shared with the environment are not counted.
+        """
+        size = sys.getsizeof(self.values) + sys.getsizeof(self.rows)
+        for row in self.rows.values():
+            size += sys.getsizeof(row) + sys.getsizeof(row[2])
+        return size
+
+def gridworldQTable(mdp):
+    "A DenseQTable for the states and actions of a gridworld.Gridworld"
+    return DenseQTable(mdp.getStates(), mdp.getPossibleActions)
+
+def crawlerQTable(environment):
+    "A DenseQTable for a crawler.CrawlingRobotEnvironment"
+    states = [(arm, hand) for arm in range(environment.nArmStates) for hand in range(environment.nHandStates)]
+    return DenseQTable(states, environment.getPossibleActions)
@@ -17,7 +17,10 @@ from learningAgents import ReinforcementAgent
 from featureExtractors import *
 
 import random,util,math
+from agentRegistry import registerAgent
+from qTables import DenseQTable
 
+@registerAgent
 class QLearningAgent(ReinforcementAgent):
     """
       Q-Learning Agent
@@ -38,13 +41,23 @@ class QLearningAgent(ReinforcementAgent):
         - self.getLegalActions(state)
           which returns legal actions for a state
     """
-    def __init__(self, **args):
-        "You can initialize Q-values here..."
+    def __init__(self, qTable=None, **args):
+        """
+        You can initialize Q-values here...
+
+        qTable holds the Q-values, keyed by (state, action): by default a new
+        util.SparseCounter, as reads of a util.Counter insert zeros and the
+        table would gain an entry for every action of every next state looked
+        at.  A qTables.DenseQTable keeps those of a small, enumerable state
+        space in an array instead.
+        """
         ReinforcementAgent.__init__(self, **args)
 
         "*** YOUR CODE HERE ***"
 
-        self.q = util.Counter()
+        if qTable == None: qTable = util.SparseCounter()
+        self.q = qTable
+        self.dense = isinstance(qTable, DenseQTable)
 
     def getQValue(self, state, action):
         """
@@ -66,7 +79,10 @@ class QLearningAgent(ReinforcementAgent):
         """
         "*** YOUR CODE HERE ***"
 
-        t_values = util.Counter()
+        if self.dense:
+            return self.q.maxQValue(state)
+
+        t_values = util.SparseCounter()
 
         for action in self.getLegalActions(state):
             t_values[action] = self.getQValue(state, action)
@@ -81,7 +97,10 @@ class QLearningAgent(ReinforcementAgent):
         """
         "*** YOUR CODE HERE ***"
 
-        t_values = util.Counter()
+        if self.dense:
+            return self.q.bestAction(state)
+
+        t_values = util.SparseCounter()
 
         for action in self.getLegalActions(state):
             t_values[action] = self.getQValue(state, action)
@@ -132,6 +151,7 @@ class QLearningAgent(ReinforcementAgent):
         return self.computeValueFromQValues(state)
 
 
+@registerAgent
 class PacmanQAgent(QLearningAgent):
     "Exactly the same as QLearningAgent, but with different default parameters"
 
@@ -164,6 +184,7 @@ class PacmanQAgent(QLearningAgent):
         return action
 
 
+@registerAgent
 class ApproximateQAgent(PacmanQAgent):
     """
        ApproximateQLearningAgent
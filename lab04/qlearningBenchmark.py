@@ -0,0 +1,84 @@
+# qlearningBenchmark.py
+# ---------------------
+# Compares Q-table types on long Q-learning runs in gridworld and the crawler.
+
+
+"""
+Runs QLearningAgent without any display, once with each Q-table type, and
+reports the final number of Q-table entries, their approximate memory use
+(util.Counter.footprint) and the number of updates per second:
+
+> python qlearningBenchmark.py -e 2000 -s 200000
+
+util.Counter inserts a zero entry for each Q-value it is asked for, while
+util.SparseCounter only stores the Q-values that were updated.  A
+qTables.DenseQTable holds every Q-value of the state space in an array.
+"""
+
+import optparse
+import random
+import time
+
+import gridworld
+import qTables
+import util
+from episodeRunner import EpisodeRunner, crawlerEnvironment
+from qlearningAgents import QLearningAgent
+
+def makeAgent(tableClass, actionFn, epsilon, alpha, gamma, denseTable):
+    """
+    A QLearningAgent with a new Q-table of type tableClass, or with denseTable
+    if tableClass is qTables.DenseQTable.
+    """
+    if tableClass == qTables.DenseQTable:
+        qTable = denseTable
+    else:
+        qTable = tableClass()
+    return QLearningAgent(actionFn=actionFn, epsilon=epsilon, alpha=alpha, gamma=gamma, qTable=qTable)
+
+def runGridworld(tableClass, gridName, episodes):
+    "Returns the agent and the number of updates after episodes episodes"
+    mdp = getattr(gridworld, 'get' + gridName)()
+    environment = gridworld.GridworldEnvironment(mdp)
+    agent = makeAgent(tableClass, mdp.getPossibleActions, 0.3, 0.5, 0.9, qTables.gridworldQTable(mdp))
+    runner = EpisodeRunner(agent, environment, 0.9)
+    runner.run(episodes)
+    return agent, runner.steps
+
+def runCrawler(tableClass, steps):
+    "Returns the agent and the number of updates after steps steps"
+    environment = crawlerEnvironment()
+    agent = makeAgent(tableClass, environment.getPossibleActions, 0.5, 0.8, 0.8, qTables.crawlerQTable(environment))
+    agent.startEpisode()
+    for step in range(steps):
+        state = environment.getCurrentState()
+        action = agent.getAction(state)
+        nextState, reward = environment.doAction(action)
+        agent.observeTransition(state, action, nextState, reward)
+    return agent, steps
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(description = 'Benchmark Q-table types on long Q-learning runs')
+    parser.add_option('-g', '--grid', dest = 'grid', default = 'BookGrid',
+                      help = 'gridworld to learn (default %default)')
+    parser.add_option('-e', '--episodes', dest = 'episodes', type = 'int', default = 2000,
+                      help = 'gridworld episodes (default %default)')
+    parser.add_option('-s', '--steps', dest = 'steps', type = 'int', default = 200000,
+                      help = 'crawler steps (default %default)')
+    parser.add_option('--seed', dest = 'seed', type = 'int', default = 0,
+                      help = 'random seed (default %default)')
+    options, _ = parser.parse_args()
+
+    runs = [('gridworld %s, %d episodes' % (options.grid, options.episodes),
+             lambda tableClass: runGridworld(tableClass, options.grid, options.episodes)),
+            ('crawler, %d steps' % options.steps,
+             lambda tableClass: runCrawler(tableClass, options.steps))]
+    for name, run in runs:
+        print name
+        for tableClass in [util.Counter, util.SparseCounter, qTables.DenseQTable]:
+            random.seed(options.seed)
+            start = time.time()
+            agent, updates = run(tableClass)
+            elapsed = time.time() - start
+            print '  %-14s %7d entries, %8.1f KB, %9.0f updates/second' % \
+                (tableClass.__name__, len(agent.q), agent.q.footprint() / 1024.0, updates / elapsed)
@@ -12,9 +12,86 @@
 # Pieter Abbeel (pabbeel@cs.berkeley.edu).
 
 
+import atexit
+import os
+import pickle
 import re
 import sys
 
+# Parsed test dictionaries are kept on disk between runs, keyed by the
+# absolute path of each file and checked against its mtime and size, so
+# editing or regenerating a .test or .solution file invalidates its entry.
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.testParser.cache')
+useCache = True
+
+class ParseCache(object):
+    """
+    The parsed files and test directory listings of earlier runs.  The cache
+    file is only read when the first file is parsed, and is written back at
+    exit if anything changed.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.entries = None # abspath -> (mtime, size, parsed value)
+        self.dirty = False
+
+    def load(self):
+        self.entries = {}
+        try:
+            with open(self.path, 'rb') as handle:
+                self.entries = pickle.load(handle)
+        except Exception:
+            pass # a missing or unreadable cache is rebuilt
+        atexit.register(self.save)
+
+    def lookup(self, path, compute):
+        """
+        Returns compute() for path, reusing the stored value while the file's
+        mtime and size are unchanged.
+        """
+        if self.entries == None: self.load()
+        key = os.path.abspath(path)
+        info = os.stat(path)
+        stamp = (info.st_mtime, info.st_size)
+        entry = self.entries.get(key)
+        if entry != None and entry[:2] == stamp:
+            return entry[2]
+        value = compute()
+        self.entries[key] = stamp + (value,)
+        self.dirty = True
+        return value
+
+    def save(self):
+        if not self.dirty: return
+        temporary = '%s.%d' % (self.path, os.getpid())
+        try:
+            with open(temporary, 'wb') as handle:
+                pickle.dump(self.entries, handle, 2)
+            os.rename(temporary, self.path)
+            self.dirty = False
+        except (IOError, OSError):
+            pass # caching is an optimization only
+
+_cache = ParseCache()
+
+def copyTestDict(testDict):
+    "Callers add keys such as test_out_file, so each gets its own dictionary"
+    copy = dict(testDict)
+    copy['__emit__'] = list(testDict['__emit__'])
+    return copy
+
+def listTests(directory):
+    """
+    Returns the sorted names, without extension, of the .test files in
+    directory.  The listing is cached against the directory's mtime.
+    """
+    def compute():
+        tests = [t for t in os.listdir(directory) if re.match('[^#~.].*\.test\Z', t)]
+        return sorted([re.match('(.*)\.test\Z', t).group(1) for t in tests])
+    if not useCache: return compute()
+    return list(_cache.lookup(directory, compute))
+
 class TestParser(object):
 
     def __init__(self, path):
@@ -33,6 +110,10 @@ class TestParser(object):
         return '\n'.join(fixed_lines)
 
     def parse(self):
+        if not useCache: return self.parseFile()
+        return copyTestDict(_cache.lookup(self.path, self.parseFile))
+
+    def parseFile(self):
         # read in the test case and remove comments
         test = {}
         with open(self.path) as handle:
@@ -13,10 +13,7 @@
 
 
 import time
-try: 
-    import pacman
-except:
-    pass
+from util import nearestPoint
 
 DRAW_EVERY = 1
 SLEEP_TIME = 0 # This can be overwritten by __init__
@@ -63,8 +60,8 @@ class PacmanGraphics:
         if self.agentCounter == 0:
             self.turn += 1
             if DISPLAY_MOVES:
-                ghosts = [pacman.nearestPoint(state.getGhostPosition(i)) for i in range(1, numAgents)]
-                print "%4d) P: %-8s" % (self.turn, str(pacman.nearestPoint(state.getPacmanPosition()))),'| Score: %-5d' % state.score,'| Ghosts:', ghosts
+                ghosts = [nearestPoint(state.getGhostPosition(i)) for i in range(1, numAgents)]
+                print "%4d) P: %-8s" % (self.turn, str(nearestPoint(state.getPacmanPosition()))),'| Score: %-5d' % state.score,'| Ghosts:', ghosts
             if self.turn % DRAW_EVERY == 0:
                 self.draw(state)
                 self.pause()
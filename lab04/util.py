@@ -13,7 +13,6 @@
 
 
 import sys
-import inspect
 import heapq, random
 import cStringIO
 
@@ -272,13 +271,14 @@ class Counter(dict):
 
     def argMax(self):
         """
-        Returns the key with the highest value.
+        Returns the key with the highest value, the first in iteration order
+        if several tie, or None if the counter is empty.
         """
-        if len(self.keys()) == 0: return None
-        all = self.items()
-        values = [x[1] for x in all]
-        maxIndex = values.index(max(values))
-        return all[maxIndex][0]
+        best, bestValue, first = None, None, True
+        for key, value in self.iteritems():
+            if first or value > bestValue:
+                best, bestValue, first = key, value, False
+        return best
 
     def sortedKeys(self):
         """
@@ -297,6 +297,17 @@ class Counter(dict):
         sortedItems.sort(cmp=compare)
         return [x[0] for x in sortedItems]
 
+    def footprint(self):
+        """
+        Returns the approximate memory used by the counter in bytes: its hash
+        table plus the key and value objects in it.  Objects shared between
+        keys, such as the state in (state, action) keys, are counted each time.
+        """
+        size = sys.getsizeof(self)
+        for key, value in self.iteritems():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+        return size
+
     def totalCount(self):
         """
         Returns the sum of counts for all keys.
@@ -425,7 +436,34 @@ class Counter(dict):
             addend[key] = -1 * y[key]
         return addend
 
+class SparseCounter(Counter):
+    """
+    A Counter whose reads do not insert: reading a missing key returns 0 and
+    leaves the counter unchanged, so tables such as Q-values keep only the
+    entries that were written.
+
+    >>> a = SparseCounter()
+    >>> print a['test']
+    0
+    >>> len(a)
+    0
+    >>> a['test'] += 2
+    >>> print a['test']
+    2
+    """
+    __getitem__ = dict.__getitem__
+
+    def __missing__(self, key):
+        return 0
+
+    def copy(self):
+        """
+        Returns a copy of the counter
+        """
+        return SparseCounter(dict.copy(self))
+
 def raiseNotDefined():
+    import inspect # only needed here, and slow to import
     fileName = inspect.stack()[1][1]
     line = inspect.stack()[1][2]
     method = inspect.stack()[1][3]
@@ -631,6 +669,9 @@ class WritableNull:
     def write(self, string):
         pass
 
+    def flush(self):
+        pass # multiprocessing flushes sys.stdout before forking a worker
+
 def mutePrint():
     global _ORIGINAL_STDOUT, _ORIGINAL_STDERR, _MUTED
     if _MUTED:
@@ -13,9 +13,12 @@
 
 
 import mdp, util
+import mdpMatrices
 
 from learningAgents import ValueEstimationAgent
+from agentRegistry import registerAgent
 
+@registerAgent
 class ValueIterationAgent(ValueEstimationAgent):
     """
         * Please read learningAgents.py before reading this.*
@@ -24,8 +27,13 @@ class ValueIterationAgent(ValueEstimationAgent):
         (see mdp.py) on initialization and runs value iteration
         for a given number of iterations using the supplied
         discount factor.
+
+        If theta is given, it stops early once no value changes
+        by more than theta in an iteration.  Afterwards
+        self.iterationsRun and self.backups (Bellman backups of one
+        state) tell how much work that took.
     """
-    def __init__(self, mdp, discount = 0.9, iterations = 100):
+    def __init__(self, mdp, discount = 0.9, iterations = 100, theta = None):
         """
           Your value iteration agent should take an mdp on
           construction, run the indicated number of iterations
@@ -42,6 +50,9 @@ class ValueIterationAgent(ValueEstimationAgent):
         self.discount = discount
         self.iterations = iterations
         self.values = util.Counter() # A Counter is a dict with default 0
+        self.theta = theta
+        self.iterationsRun = 0
+        self.backups = 0
 
         # Write value iteration code here
         "*** YOUR CODE HERE ***"
@@ -56,9 +67,16 @@ class ValueIterationAgent(ValueEstimationAgent):
 
                 v_tilde[state] = q_tilde[q_tilde.argMax()]
 
+            residual = 0
             for state in self.mdp.getStates():
+                residual = max(residual, abs(v_tilde[state] - self.values[state]))
                 self.values[state] = v_tilde[state]
 
+            self.iterationsRun += 1
+            self.backups += len(v_tilde)
+            if self.theta != None and residual <= self.theta:
+                break
+
 
 
     def getValue(self, state):
@@ -85,6 +103,16 @@ class ValueIterationAgent(ValueEstimationAgent):
         return q
 
 
+    def computeValueFromValues(self, state):
+        """
+          The Bellman backup of state: the largest Q-value of
+          its actions, or 0 if it has none.
+        """
+        actions = self.mdp.getPossibleActions(state)
+        if len(actions) == 0:
+            return 0
+        return max([self.computeQValueFromValues(state, action) for action in actions])
+
     def computeActionFromValues(self, state):
         """
           The policy is the best action in the given state
@@ -115,3 +143,198 @@ class ValueIterationAgent(ValueEstimationAgent):
 
     def getQValue(self, state, action):
         return self.computeQValueFromValues(state, action)
+
+@registerAgent
+class MatrixValueIterationAgent(ValueIterationAgent):
+    """
+        A ValueIterationAgent that compiles the MDP once into
+        transition matrices and expected rewards (see mdpMatrices.py)
+        and runs each iteration as one matrix-vector product per
+        action, instead of asking the MDP for every transition
+        again.  The values are the same as ValueIterationAgent's.
+    """
+    def __init__(self, mdp, discount = 0.9, iterations = 100, theta = None):
+        self.mdp = mdp
+        self.discount = discount
+        self.iterations = iterations
+        self.values = util.Counter()
+        self.theta = theta
+        self.iterationsRun = 0
+        self.backups = 0
+
+        matrices = mdpMatrices.MDPMatrices(mdp)
+        values = matrices.zeros()
+        for _ in range(self.iterations):
+            newValues = matrices.backup(values, self.discount)
+            residual = mdpMatrices.maxResidual(values, newValues)
+            values = newValues
+            self.iterationsRun += 1
+            self.backups += len(matrices.states)
+            if self.theta != None and residual <= self.theta:
+                break
+        if self.iterations > 0:
+            matrices.valueDict(values, self.values)
+
+@registerAgent
+class AsynchronousValueIterationAgent(ValueIterationAgent):
+    """
+        Value iteration with in-place (Gauss-Seidel) sweeps: each
+        state's backup already uses the values updated earlier in
+        the same sweep, which usually converges in fewer sweeps.
+        iterations and theta limit the sweeps as in
+        ValueIterationAgent.
+    """
+    def __init__(self, mdp, discount = 0.9, iterations = 100, theta = None):
+        self.mdp = mdp
+        self.discount = discount
+        self.iterations = iterations
+        self.values = util.Counter()
+        self.theta = theta
+        self.iterationsRun = 0
+        self.backups = 0
+
+        states = self.mdp.getStates()
+        for _ in range(self.iterations):
+            residual = 0
+            for state in states:
+                value = self.computeValueFromValues(state)
+                residual = max(residual, abs(value - self.values[state]))
+                self.values[state] = value
+            self.iterationsRun += 1
+            self.backups += len(states)
+            if self.theta != None and residual <= self.theta:
+                break
+
+@registerAgent
+class PrioritizedSweepingValueIterationAgent(ValueIterationAgent):
+    """
+        Prioritized sweeping: states are backed up one at a time,
+        the state whose value is furthest from its backup
+        (its Bellman error) first.
+
+        Every state's error is computed once; after that the agent
+        keeps only an upper bound on it.  When a state's value
+        changes by delta, the backup of a predecessor that reaches
+        it with probability at most p under any action changes by
+        at most discount * p * delta, so that is added to the
+        predecessor's bound, without computing its backup.  A state
+        is queued by its bound while the bound is over theta (1e-5
+        if none is given), once: an entry whose bound has grown
+        since it was pushed is skipped when popped.  A state is
+        backed up only when it is popped, and its bound is then 0.
+
+        It stops when no bound is over theta, so no state is off by
+        more than theta, or after iterations * len(states) state
+        updates, the work of that many full sweeps.  updates counts
+        the state updates and iterationsRun the full sweeps they
+        add up to, rounded up, to compare with the other agents;
+        backups counts the Bellman backups, the first error of each
+        state and one per update.  That is fewer backups than value
+        iteration, but the queue costs about as much again, so it is
+        not faster than value iteration in wall time.
+    """
+    def __init__(self, mdp, discount = 0.9, iterations = 100, theta = None):
+        self.mdp = mdp
+        self.discount = discount
+        self.iterations = iterations
+        self.values = util.Counter()
+        self.theta = theta
+        if self.theta == None:
+            self.theta = 1e-5
+        self.iterationsRun = 0
+        self.updates = 0
+        self.backups = 0
+
+        states = self.mdp.getStates()
+        predecessors = self.computePredecessors(states)
+        queue = util.PriorityQueue()
+        bound = {} # state -> upper bound on its Bellman error
+
+        for state in states:
+            self.backups += 1
+            bound[state] = abs(self.computeValueFromValues(state) - self.values[state])
+            if bound[state] > self.theta:
+                queue.push((state, bound[state]), -bound[state])
+        budget = self.iterations * len(states)
+        while not queue.isEmpty() and self.updates < budget:
+            state, pushedBound = queue.pop()
+            if pushedBound != bound[state]:
+                continue # stale: queued again with a larger bound, or already backed up
+            value = self.computeValueFromValues(state)
+            delta = abs(value - self.values[state])
+            self.values[state] = value
+            bound[state] = 0.0
+            self.updates += 1
+            self.backups += 1
+            if delta == 0: continue
+            for predecessor, probability in predecessors[state].items():
+                bound[predecessor] += self.discount * probability * delta
+                if bound[predecessor] > self.theta:
+                    queue.push((predecessor, bound[predecessor]), -bound[predecessor])
+        self.iterationsRun = (self.updates + len(states) - 1) // len(states)
+
+    def computePredecessors(self, states):
+        """
+        Maps each state to the states that can reach it in one step,
+        each with the largest probability of doing so under any action
+        """
+        predecessors = dict([(state, {}) for state in states])
+        for state in states:
+            for action in self.mdp.getPossibleActions(state):
+                for nextState, probability in self.mdp.getTransitionStatesAndProbs(state, action):
+                    if probability > predecessors[nextState].get(state, 0):
+                        predecessors[nextState][state] = probability
+        return predecessors
+
+@registerAgent
+class PolicyIterationAgent(ValueIterationAgent):
+    """
+        Policy iteration on the compiled MDP (see mdpMatrices.py):
+        starting from the first legal action of every state, it
+        evaluates the policy exactly and makes it greedy with
+        respect to those values, until the policy no longer
+        changes or after iterations improvement steps.
+
+        Policies are evaluated by solving their linear system when
+        NumPy is installed, and otherwise by in-place sweeps
+        warm-started from the previous policy's values, until no
+        value changes by more than theta (1e-10 if none is given).
+        iterationsRun counts improvement steps; backups counts the
+        state backups of the improvement steps and of any sweeps.
+    """
+    def __init__(self, mdp, discount = 0.9, iterations = 100, theta = None):
+        self.mdp = mdp
+        self.discount = discount
+        self.iterations = iterations
+        self.values = util.Counter()
+        self.theta = theta
+        if self.theta == None:
+            self.theta = 1e-10
+        self.iterationsRun = 0
+        self.backups = 0
+
+        matrices = mdpMatrices.MDPMatrices(mdp)
+        n = len(matrices.states)
+        policy = [(actions or (None,))[0] for actions in matrices.stateActions]
+        values = matrices.zeros()
+        for _ in range(self.iterations):
+            values, sweeps = matrices.evaluate(policy, self.discount, values, self.theta)
+            improved = matrices.greedyPolicy(values, self.discount, policy)
+            self.iterationsRun += 1
+            self.backups += (sweeps + 1) * n
+            if improved == policy:
+                break
+            policy = improved
+
+        if self.iterations > 0:
+            matrices.valueDict(values, self.values)
+        self.policy = dict(zip(matrices.states, policy))
+
+    def computeActionFromValues(self, state):
+        """
+          The action of the final policy, which is greedy with
+          respect to its own values.
+        """
+        if state in self.policy:
+            return self.policy[state]
+        return ValueIterationAgent.computeActionFromValues(self, state)